@@ -0,0 +1,223 @@
+"""Admission control: concurrency lanes and per-client rate limits.
+
+Each reading type generates through its own lane, so a burst of slow
+comprehensive readings cannot take every upstream slot from quick daily
+ones. A lane runs a fixed number of generations at once and queues a few
+more; past that, or after waiting too long in the queue, a request is
+refused straight away and served the fallback reading instead.
+
+Each lane also watches its own pressure. When its queue or the time the
+upstream takes to answer its readings climbs past a threshold, that reading
+type goes into degraded mode and serves precomputed corpus readings instead
+of generating, until pressure has stayed low for a while. Other reading
+types keep generating.
+
+Separately, every client gets a token bucket, charged only for readings
+that still have to be generated; cached pages never count against it.
+Requests beyond it get a fast 429. Tuned through environment variables:
+
+- ADMISSION_QUEUE_SIZE: generations allowed to wait per lane (default 64)
+- ADMISSION_QUEUE_TIMEOUT: seconds a generation may wait for a slot (default 2)
+- DEGRADED_MODE: auto, on (always serve the corpus) or off (default auto)
+- DEGRADE_QUEUE_DEPTH: generations waiting in a lane that trigger it (default 32)
+- DEGRADE_LATENCY: smoothed seconds until the upstream answers that trigger it,
+  scaled per reading type; streams count until their first fragment (default 5)
+- DEGRADE_MIN_SAMPLES: readings timed before latency can trigger it (default 5)
+- DEGRADE_HOLD: minimum seconds to stay degraded (default 30)
+- CLIENT_RATE: requests per second refilled per client; 0 disables (default 2)
+- CLIENT_BURST: requests a client may make at once (default 20)
+- TRUST_FORWARDED_FOR: 1 to identify clients by X-Forwarded-For, only behind a
+  proxy that sets it (default 1 on Vercel, else 0)
+"""
+
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+
+from fastapi import HTTPException, Request
+
+from .metrics import Counter
+
+QUEUE_SIZE = int(os.getenv("ADMISSION_QUEUE_SIZE", "64"))
+QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "2"))
+CLIENT_RATE = float(os.getenv("CLIENT_RATE", "2"))
+CLIENT_BURST = float(os.getenv("CLIENT_BURST", "20"))
+MAX_TRACKED_CLIENTS = 10000
+TRUST_FORWARDED_FOR = os.getenv("TRUST_FORWARDED_FOR", "1" if os.getenv("VERCEL") else "0") == "1"
+DEGRADED_MODE = os.getenv("DEGRADED_MODE", "auto")
+DEGRADE_QUEUE_DEPTH = int(os.getenv("DEGRADE_QUEUE_DEPTH", "32"))
+DEGRADE_LATENCY = float(os.getenv("DEGRADE_LATENCY", "5"))
+DEGRADE_MIN_SAMPLES = int(os.getenv("DEGRADE_MIN_SAMPLES", "5"))
+DEGRADE_HOLD = float(os.getenv("DEGRADE_HOLD", "30"))
+# Weight of the newest sample in the smoothed latency
+LATENCY_SMOOTHING = 0.2
+
+lane_rejections = Counter(
+    "lane_rejections_total",
+    "Generations refused by a concurrency lane, by lane and reason.",
+    ("lane", "reason")
+)
+
+
+class Overloaded(Exception):
+    """Raised instead of queueing once a lane is full or the wait runs out."""
+
+
+class PressureGauge:
+    """Decide when to stop generating and serve precomputed readings instead.
+
+    Degraded mode starts once the queue depth or the smoothed upstream
+    latency reaches its threshold; latency only counts once ``min_samples``
+    readings have been timed, so one slow reading cannot trigger it. It
+    ends after at least ``hold`` seconds once the queue is under half the
+    threshold; the latency estimate is then cleared, since nothing was
+    generated to update it, and the first readings generated afterwards act
+    as the probe.
+    """
+
+    def __init__(
+        self,
+        mode: str = DEGRADED_MODE,
+        max_queue: int = DEGRADE_QUEUE_DEPTH,
+        max_latency: float = DEGRADE_LATENCY,
+        hold: float = DEGRADE_HOLD,
+        min_samples: int = DEGRADE_MIN_SAMPLES
+    ):
+        self.mode = mode
+        self.max_queue = max_queue
+        self.max_latency = max_latency
+        self.hold = hold
+        self.min_samples = min_samples
+        self.samples = 0
+        self.latency = None
+        self.active = mode == "on"
+        self.since = 0.0
+
+    def observe_latency(self, seconds: float) -> None:
+        """Fold one generation's time to answer into the smoothed latency."""
+        self.samples += 1
+        if self.latency is None:
+            self.latency = seconds
+        else:
+            self.latency += LATENCY_SMOOTHING * (seconds - self.latency)
+
+    def degraded(self, queue_depth: int) -> bool:
+        """Return whether to serve from the corpus, given how many generations are queued."""
+        if self.mode != "auto":
+            return self.mode == "on"
+        now = time.monotonic()
+        latency = self.latency if self.samples >= self.min_samples else 0.0
+        if not self.active:
+            if queue_depth >= self.max_queue or latency >= self.max_latency:
+                self.active = True
+                self.since = now
+        elif now - self.since >= self.hold and queue_depth < self.max_queue / 2:
+            self.active = False
+            self.latency = None
+            self.samples = 0
+        return self.active
+
+
+class Lane:
+    """Bounded concurrency with a bounded, deadline-limited wait queue and its own pressure gauge."""
+
+    def __init__(
+        self,
+        name: str,
+        limit: int,
+        max_queue: int = QUEUE_SIZE,
+        queue_timeout: float = QUEUE_TIMEOUT,
+        latency_factor: float = 1.0
+    ):
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self.waiting = 0
+        self.pressure = PressureGauge(max_latency=DEGRADE_LATENCY * latency_factor)
+        self._semaphore = asyncio.Semaphore(limit)
+
+    def degraded(self) -> bool:
+        """Return whether this lane's readings should come from the corpus for now."""
+        return self.pressure.degraded(self.waiting)
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold one of the lane's slots, raising Overloaded rather than waiting too long."""
+        if self._semaphore.locked():
+            if self.waiting >= self.max_queue:
+                lane_rejections.inc(lane=self.name, reason="queue_full")
+                raise Overloaded(f"{self.name} lane queue is full")
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                lane_rejections.inc(lane=self.name, reason="queue_timeout")
+                raise Overloaded(f"no {self.name} slot within {self.queue_timeout:g}s") from None
+            finally:
+                self.waiting -= 1
+        else:
+            await self._semaphore.acquire()
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._semaphore.release()
+
+
+class ClientRateLimiter:
+    """Token bucket per client, keeping only the most recently seen clients."""
+
+    def __init__(self, rate: float = CLIENT_RATE, burst: float = CLIENT_BURST, max_clients: int = MAX_TRACKED_CLIENTS):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets = OrderedDict()
+
+    def take(self, client: str, cost: float = 1.0) -> float:
+        """Spend ``cost`` tokens; return 0 if allowed, else seconds until it would be."""
+        if self.rate <= 0:
+            return 0.0
+        now = time.monotonic()
+        tokens, updated = self._buckets.pop(client, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated) * self.rate)
+        wait = 0.0
+        if tokens >= cost:
+            tokens -= cost
+        else:
+            wait = (cost - tokens) / self.rate
+        self._buckets[client] = (tokens, now)
+        if len(self._buckets) > self.max_clients:
+            self._buckets.popitem(last=False)
+        return wait
+
+
+client_limiter = ClientRateLimiter()
+
+
+def client_key(request: Request) -> str:
+    """Identify the caller, using X-Forwarded-For only when a trusted proxy (e.g. Vercel) sets it."""
+    if TRUST_FORWARDED_FOR:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            # The proxy appends the address it saw; anything before it came from the client
+            return forwarded.split(",")[-1].strip()
+    return request.client.host if request.client else "unknown"
+
+
+def charge_generation(request: Request, generations: int = 1) -> None:
+    """Charge a client for readings about to be generated, answering 429 once its bucket is empty."""
+    if not generations:
+        return
+    # A request costing more than the burst could never be allowed otherwise
+    wait = client_limiter.take(client_key(request), min(generations, client_limiter.burst))
+    if wait:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many requests, please slow down",
+            headers={"Retry-After": str(max(1, round(wait)))}
+        )
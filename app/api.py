@@ -0,0 +1,87 @@
+"""JSON API for mobile clients and partner integrations."""
+
+import asyncio
+from datetime import date
+
+from fastapi import APIRouter, Request
+from pydantic import BaseModel, Field, field_validator, model_validator
+
+from .admission import charge_generation
+from .metrics import label_request
+from .horoscope import READING_TYPES, generate_horoscope, is_final_reading
+from .zodiac import get_sign_data, get_zodiac_sign, is_valid_birthday
+
+MAX_BATCH_SIZE = 1000
+
+router = APIRouter(prefix="/api")
+
+
+class HoroscopeRequest(BaseModel):
+    """Birth details and reading type for one horoscope."""
+
+    name: str = ""
+    month: int = Field(ge=1, le=12)
+    day: int = Field(ge=1, le=31)
+    year: int = 2000
+    reading_type: str = "daily"
+
+    @field_validator("reading_type")
+    @classmethod
+    def known_reading_type(cls, value: str) -> str:
+        if value not in READING_TYPES:
+            raise ValueError(f"reading_type must be one of {', '.join(READING_TYPES)}")
+        return value
+
+    @model_validator(mode="after")
+    def real_birthday(self):
+        if not is_valid_birthday(self.month, self.day):
+            raise ValueError(f"Invalid birth date: month {self.month}, day {self.day}")
+        return self
+
+
+class BatchRequest(BaseModel):
+    """Several horoscope requests answered in one response."""
+
+    requests: list[HoroscopeRequest] = Field(max_length=MAX_BATCH_SIZE)
+
+
+def _reading_response(sign: str, reading_type: str, horoscope: dict) -> dict:
+    """Combine a generated horoscope with the sign's metadata."""
+    return {
+        "sign": sign,
+        "reading_type": reading_type,
+        "date": date.today().isoformat(),
+        "sign_data": get_sign_data(sign),
+        **horoscope
+    }
+
+
+@router.post("/horoscope")
+async def api_horoscope(request: HoroscopeRequest, http_request: Request):
+    """Return one horoscope with its sign metadata as JSON."""
+    label_request(reading_type=request.reading_type)
+    sign = get_zodiac_sign(request.month, request.day)
+    if not is_final_reading(sign, request.reading_type, date.today()):
+        charge_generation(http_request)
+    horoscope = await generate_horoscope(sign, request.reading_type)
+    return _reading_response(sign, request.reading_type, horoscope)
+
+
+@router.post("/horoscopes/batch")
+async def api_horoscopes_batch(batch: BatchRequest, http_request: Request):
+    """Return horoscopes for many requests, generating each sign and type once."""
+    groups = list(dict.fromkeys(
+        (get_zodiac_sign(request.month, request.day), request.reading_type) for request in batch.requests
+    ))
+    today = date.today()
+    charge_generation(http_request, sum(1 for key in groups if not is_final_reading(*key, today)))
+
+    # One generation per unique (sign, reading type), run concurrently
+    readings = await asyncio.gather(*[generate_horoscope(sign, reading_type) for sign, reading_type in groups])
+    by_key = dict(zip(groups, readings))
+
+    results = []
+    for request in batch.requests:
+        key = (get_zodiac_sign(request.month, request.day), request.reading_type)
+        results.append({"name": request.name, **_reading_response(*key, by_key[key])})
+    return {"results": results}
@@ -0,0 +1,111 @@
+"""Pre-rendered, pre-encoded payloads served with strong ETags."""
+
+import hashlib
+import time
+from datetime import date, datetime
+
+from fastapi import Request, Response
+
+from .cache import ReadingCache, next_local_midnight, reading_cache_key
+from .compression import choose_encoding, compress, supported_encodings
+from .templates import GUEST_NAME, STYLESHEET_HREF, get_base_css, render_home_page, render_reading_page
+
+HOME_CACHE_CONTROL = "public, max-age=300"
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Pages streamed while their reading was generated may hold fallback text, so
+# edges only keep them for a minute; by then the final page can be served
+PROVISIONAL_CACHE_CONTROL = "public, max-age=0, s-maxage=60"
+BROWSER_MAX_AGE = 300
+STALE_WHILE_REVALIDATE = 600
+
+
+class Asset:
+    """An immutable response body with its media type and strong ETag.
+
+    The body is compressed once, at the best ratio, with every encoding the
+    server supports, so requests never pay for compression.
+    """
+
+    def __init__(self, body: bytes, media_type: str):
+        self.body = body
+        self.media_type = media_type
+        self.digest = hashlib.sha256(body).hexdigest()[:32]
+        self.etag = f'"{self.digest}"'
+        self.variants = {
+            encoding: compress(body, encoding, best=True)
+            for encoding in supported_encodings()
+        }
+
+    def etag_for(self, encoding) -> str:
+        """Return the strong ETag of one encoded representation."""
+        return self.etag if encoding is None else f'"{self.digest}-{encoding}"'
+
+    def matches(self, if_none_match: str, encoding=None) -> bool:
+        """Check an If-None-Match header against a representation's ETag."""
+        if not if_none_match:
+            return False
+        if if_none_match.strip() == "*":
+            return True
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return self.etag_for(encoding) in tags
+
+
+_home_page = None
+_home_page_year = None
+
+
+def get_home_page() -> Asset:
+    """Return the rendered home page, rebuilding it when the year changes."""
+    global _home_page, _home_page_year
+    year = datetime.now().year
+    if _home_page is None or _home_page_year != year:
+        _home_page = Asset(render_home_page().encode("utf-8"), "text/html; charset=utf-8")
+        _home_page_year = year
+    return _home_page
+
+
+_stylesheet = Asset(get_base_css().encode("utf-8"), "text/css; charset=utf-8")
+
+
+def get_stylesheet(fingerprint: str):
+    """Return the base stylesheet if the fingerprint is the current one."""
+    return _stylesheet if f"/static/styles.{fingerprint}.css" == STYLESHEET_HREF else None
+
+
+_reading_pages = ReadingCache(max_size=128)
+
+
+def get_reading_page(sign: str, reading_type: str, day: date, horoscope: dict) -> Asset:
+    """Return the canonical page of a generated reading, rendered and compressed once a day."""
+    key = reading_cache_key(sign, reading_type, day)
+    asset = _reading_pages.get(key)
+    if asset is None:
+        body = render_reading_page(GUEST_NAME, sign, reading_type, horoscope).encode("utf-8")
+        asset = Asset(body, "text/html; charset=utf-8")
+        _reading_pages.set(key, asset, next_local_midnight(day))
+    return asset
+
+
+def reading_cache_control(day: date) -> str:
+    """Cache-Control letting shared caches keep a day's reading until that day ends."""
+    remaining = max(0, int(next_local_midnight(day) - time.time()))
+    return (
+        f"public, max-age={min(remaining, BROWSER_MAX_AGE)}, s-maxage={remaining}, "
+        f"stale-while-revalidate={STALE_WHILE_REVALIDATE}"
+    )
+
+
+def asset_response(asset: Asset, request: Request, cache_control: str) -> Response:
+    """Serve an asset in the best accepted encoding, or 304 Not Modified."""
+    encoding = choose_encoding(request.headers.get("accept-encoding", ""), list(asset.variants))
+    headers = {
+        "ETag": asset.etag_for(encoding),
+        "Cache-Control": cache_control,
+        "Vary": "Accept-Encoding"
+    }
+    if asset.matches(request.headers.get("if-none-match", ""), encoding):
+        return Response(status_code=304, headers=headers)
+    if encoding is None:
+        return Response(content=asset.body, media_type=asset.media_type, headers=headers)
+    headers["Content-Encoding"] = encoding
+    return Response(content=asset.variants[encoding], media_type=asset.media_type, headers=headers)
@@ -0,0 +1,233 @@
+"""Generation backends that turn a reading prompt into the reading's JSON text.
+
+Pick one with GENERATION_BACKEND:
+
+- openai (default): asks the model through the shared AsyncOpenAI client
+- local: composes readings from each sign's traits without any network
+  call, so load tests, benchmarks and offline runs cost nothing and give
+  the same reading for the same sign, type and day
+
+The local backend can pretend to be a real upstream:
+
+- LOCAL_LATENCY: median seconds per reading (default 0)
+- LOCAL_LATENCY_SIGMA: spread of a log-normal latency; 0 keeps it fixed (default 0)
+- LOCAL_ERROR_RATE: share of calls that fail, 0 to 1 (default 0)
+- LOCAL_SEED: seed for the latency and error draws (default 0)
+"""
+
+import asyncio
+import json
+import math
+import os
+import random
+
+from . import llm
+from .zodiac import ZODIAC_SIGNS
+
+BACKEND_NAME = os.getenv("GENERATION_BACKEND", "openai")
+LOCAL_LATENCY = float(os.getenv("LOCAL_LATENCY", "0"))
+LOCAL_LATENCY_SIGMA = float(os.getenv("LOCAL_LATENCY_SIGMA", "0"))
+LOCAL_ERROR_RATE = float(os.getenv("LOCAL_ERROR_RATE", "0"))
+LOCAL_SEED = int(os.getenv("LOCAL_SEED", "0"))
+
+# Share of a simulated latency spent before the first fragment arrives
+FIRST_FRAGMENT_SHARE = 0.3
+FRAGMENT_SIZE = 16
+
+SECTION_TEMPLATES = {
+    "general": [
+        "Your {trait} side sets the tone today, and the {element} in you is ready to act on it.",
+        "A {trait} instinct pulls you toward something you have been circling for weeks.",
+        "The day rewards the {trait} {sign} who stops waiting for perfect timing."
+    ],
+    "love": [
+        "Your {trait} heart draws people closer than you realise, so let someone see it.",
+        "In love, being {trait} works best when you also leave room to listen.",
+        "A quiet, {trait} gesture says more to the people you care about than any speech."
+    ],
+    "career": [
+        "At work your {trait} approach gets noticed by the people who decide what comes next.",
+        "A {trait} idea you have been sitting on is worth putting in front of others now.",
+        "Money matters favour a {trait} plan over a quick win this week."
+    ],
+    "health": [
+        "Your body responds well to {trait} routines, so keep today's simple and steady.",
+        "Channel your {trait} energy into movement rather than letting it turn into restlessness.",
+        "Rest counts as progress for a {trait} {sign}; protect your evening."
+    ],
+    "advice": [
+        "Trust the {trait} part of you, but check it against one honest friend.",
+        "Say yes to the smaller step you can take today instead of the big one you keep postponing.",
+        "Write down what you want from this week; {element} signs move fastest with a clear aim."
+    ]
+}
+
+LUCKY_COLORS = ["Gold", "Silver", "Azure", "Emerald", "Violet", "Coral", "Crimson", "Ivory"]
+
+
+class LocalBackendError(Exception):
+    """Simulated upstream failure raised by the local backend."""
+
+
+class GenerationBackend:
+    """Interface for producing a reading from a prompt.
+
+    A prompt is the dict built by ``horoscope._build_prompt``: sign,
+    reading_type, day, sections, plus the chat messages and completion
+    options an LLM backend sends upstream.
+    """
+
+    name = ""
+
+    async def complete(self, prompt: dict) -> tuple:
+        """Return the reading as JSON text together with its token usage, or None."""
+        raise NotImplementedError
+
+    async def open_stream(self, prompt: dict):
+        """Start a reading and return an async iterable of JSON text fragments with ``close()``."""
+        raise NotImplementedError
+
+
+class _OpenAIFragments:
+    """Text fragments of a streamed chat completion, recording its token usage."""
+
+    def __init__(self, upstream):
+        self.upstream = upstream
+
+    async def __aiter__(self):
+        async for chunk in self.upstream:
+            # The final chunk carries the token usage and no choices
+            llm.record_usage(getattr(chunk, "usage", None))
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+    async def close(self) -> None:
+        await self.upstream.close()
+
+
+class OpenAIBackend(GenerationBackend):
+    """Generate readings with the OpenAI chat completions API."""
+
+    name = "openai"
+
+    async def complete(self, prompt: dict) -> tuple:
+        response = await llm.get_client().chat.completions.create(
+            messages=prompt["messages"],
+            **prompt["options"]
+        )
+        llm.record_usage(response.usage)
+        return response.choices[0].message.content or "", response.usage
+
+    async def open_stream(self, prompt: dict):
+        upstream = await llm.get_client().chat.completions.create(
+            messages=prompt["messages"],
+            stream=True,
+            stream_options={"include_usage": True},
+            **prompt["options"]
+        )
+        return _OpenAIFragments(upstream)
+
+
+class _LocalFragments:
+    """Fragments of a composed reading, paced to look like a streamed reply."""
+
+    def __init__(self, text: str, latency: float, fail: bool):
+        self.text = text
+        self.latency = latency
+        self.fail = fail
+
+    async def __aiter__(self):
+        pieces = [self.text[i:i + FRAGMENT_SIZE] for i in range(0, len(self.text), FRAGMENT_SIZE)]
+        pause = self.latency * (1 - FIRST_FRAGMENT_SHARE) / len(pieces)
+        for index, piece in enumerate(pieces):
+            if self.fail and index == len(pieces) // 2:
+                raise LocalBackendError("simulated upstream error mid-stream")
+            if pause:
+                await asyncio.sleep(pause)
+            yield piece
+
+    async def close(self) -> None:
+        pass
+
+
+class LocalBackend(GenerationBackend):
+    """Compose readings from sign traits, with optional simulated latency and errors.
+
+    The text only depends on the sign, reading type and day. Latency and
+    failures are drawn from a generator seeded with ``seed``, so a run with
+    the same settings and call order behaves the same way every time.
+    """
+
+    name = "local"
+
+    def __init__(
+        self,
+        latency: float = LOCAL_LATENCY,
+        latency_sigma: float = LOCAL_LATENCY_SIGMA,
+        error_rate: float = LOCAL_ERROR_RATE,
+        seed: int = LOCAL_SEED
+    ):
+        self.latency = latency
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+
+    def _draw(self) -> tuple:
+        """Draw one call's latency and whether it fails."""
+        latency = self.latency
+        if latency > 0 and self.latency_sigma > 0:
+            latency = self._rng.lognormvariate(math.log(latency), self.latency_sigma)
+        return latency, self._rng.random() < self.error_rate
+
+    async def complete(self, prompt: dict) -> tuple:
+        latency, fail = self._draw()
+        if latency:
+            await asyncio.sleep(latency)
+        if fail:
+            raise LocalBackendError("simulated upstream error")
+        return compose_reading(prompt["sign"], prompt["reading_type"], prompt["day"], prompt["sections"]), None
+
+    async def open_stream(self, prompt: dict):
+        latency, fail = self._draw()
+        if latency:
+            await asyncio.sleep(latency * FIRST_FRAGMENT_SHARE)
+        text = compose_reading(prompt["sign"], prompt["reading_type"], prompt["day"], prompt["sections"])
+        return _LocalFragments(text, latency, fail)
+
+
+def compose_reading(sign: str, reading_type: str, day, sections: list) -> str:
+    """Compose a reading's JSON text from the sign's traits, the same for the same day."""
+    sign_data = ZODIAC_SIGNS[sign]
+    rng = random.Random(f"{sign}:{reading_type}:{day.isoformat()}")
+    words = {"sign": sign.title(), "element": sign_data["element"]}
+    reading = {
+        "sections": {
+            section: " ".join(
+                template.format(trait=rng.choice(sign_data["traits"]).lower(), **words)
+                for template in rng.sample(SECTION_TEMPLATES[section], 2)
+            )
+            for section in sections
+        },
+        "lucky_number": rng.randint(1, 99),
+        "lucky_color": rng.choice(LUCKY_COLORS),
+        "energy_level": rng.randint(60, 100)
+    }
+    return json.dumps(reading)
+
+
+BACKENDS = {
+    "openai": OpenAIBackend,
+    "local": LocalBackend
+}
+
+_backend = None
+
+
+def get_backend() -> GenerationBackend:
+    """Return the backend chosen by GENERATION_BACKEND."""
+    global _backend
+    if _backend is None:
+        if BACKEND_NAME not in BACKENDS:
+            raise ValueError(f"GENERATION_BACKEND must be one of {', '.join(BACKENDS)}")
+        _backend = BACKENDS[BACKEND_NAME]()
+    return _backend
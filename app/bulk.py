@@ -0,0 +1,206 @@
+"""Generate readings for a large CSV or JSONL list of users.
+
+    python -m app.bulk subscribers.csv readings.jsonl --concurrency 8 --rate 5
+    python -m app.bulk subscribers.csv readings.jsonl --resume
+
+Each input row needs ``month`` and ``day`` and may carry ``name``, ``year``
+and ``reading_type``; any other columns are copied to the output. Rows are
+streamed in windows, so memory stays flat however long the file is, and each
+sign and reading type is only generated once per run. After every window
+the output is flushed and a checkpoint is written next to it, so an
+interrupted run can pick up where it stopped with ``--resume``.
+
+Fallback or corpus text is never sent out as a reading: a sign and reading
+type that cannot be generated after a few retries gets an ``error`` on its
+rows instead, and the command exits with status 1.
+"""
+
+import argparse
+import asyncio
+import csv
+import itertools
+import json
+import os
+import time
+from datetime import date
+
+from . import llm
+from .horoscope import READING_TYPES, generate_horoscope, is_final_reading
+from .zodiac import get_zodiac_sign
+
+DEFAULT_CONCURRENCY = 8
+DEFAULT_WINDOW = 1000
+DEFAULT_RETRIES = 2
+RETRY_BACKOFF = 0.5
+
+
+class RateLimiter:
+    """Space out upstream calls to at most ``rate`` starts per second."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            if self._next > now:
+                await asyncio.sleep(self._next - now)
+            self._next = max(now, self._next) + self.interval
+
+
+def read_rows(path: str, fmt: str):
+    """Yield input rows as dicts, one at a time."""
+    with open(path, newline="", encoding="utf-8") as f:
+        if fmt == "csv":
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def _checkpoint_path(output: str) -> str:
+    return output + ".checkpoint"
+
+
+def _load_checkpoint(output: str) -> dict:
+    """Return the rows done and output offset of an earlier run."""
+    try:
+        with open(_checkpoint_path(output)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"rows": 0, "offset": 0}
+
+
+def _save_checkpoint(output: str, rows: int, offset: int) -> None:
+    """Atomically record how far the output is complete."""
+    tmp = _checkpoint_path(output) + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump({"rows": rows, "offset": offset}, f)
+    os.replace(tmp, _checkpoint_path(output))
+
+
+def _parse_row(row: dict) -> tuple:
+    """Return the sign and reading type for a row, validating its birth date."""
+    reading_type = row.get("reading_type") or "daily"
+    if reading_type not in READING_TYPES:
+        raise ValueError(f"Unknown reading_type: {reading_type}")
+    return get_zodiac_sign(int(row["month"]), int(row["day"])), reading_type
+
+
+async def run_bulk(
+    input_path: str,
+    output_path: str,
+    fmt: str = "csv",
+    concurrency: int = DEFAULT_CONCURRENCY,
+    rate: float = 0.0,
+    window: int = DEFAULT_WINDOW,
+    resume: bool = False,
+    retries: int = DEFAULT_RETRIES
+) -> dict:
+    """Generate a reading for every input row and append them as JSONL."""
+    checkpoint = {"rows": 0, "offset": 0}
+    if resume:
+        saved = _load_checkpoint(output_path)
+        # A checkpoint only holds while the output it describes is still there
+        if os.path.exists(output_path) and os.path.getsize(output_path) >= saved["offset"]:
+            checkpoint = saved
+    semaphore = asyncio.Semaphore(concurrency)
+    limiter = RateLimiter(rate)
+    readings = {}
+    stats = {"rows": checkpoint["rows"], "written": 0, "errors": 0, "generated": 0, "failed": 0}
+
+    async def reading_for(sign: str, reading_type: str) -> None:
+        async with semaphore:
+            for attempt in range(retries + 1):
+                if attempt:
+                    await asyncio.sleep(RETRY_BACKOFF * 2 ** (attempt - 1))
+                await limiter.wait()
+                day = date.today()
+                horoscope = await generate_horoscope(sign, reading_type)
+                # generate_horoscope never raises; anything it did not cache is fallback text
+                if is_final_reading(sign, reading_type, day):
+                    readings[(sign, reading_type)] = horoscope
+                    stats["generated"] += 1
+                    return
+            stats["failed"] += 1
+
+    mode = "r+" if resume and os.path.exists(output_path) else "w"
+    with open(output_path, mode, encoding="utf-8") as out:
+        # Drop anything written after the last checkpoint
+        out.seek(checkpoint["offset"])
+        out.truncate()
+        rows = itertools.islice(read_rows(input_path, fmt), checkpoint["rows"], None)
+
+        while True:
+            batch = list(itertools.islice(rows, window))
+            if not batch:
+                break
+            parsed = []
+            for row in batch:
+                try:
+                    parsed.append((row, *_parse_row(row), None))
+                except (KeyError, ValueError) as exc:
+                    parsed.append((row, None, None, f"{type(exc).__name__}: {exc}"))
+
+            # Only sign/type pairs this run has not seen yet reach the model
+            missing = {(sign, reading_type) for _, sign, reading_type, error in parsed if error is None}
+            missing -= readings.keys()
+            await asyncio.gather(*[reading_for(sign, reading_type) for sign, reading_type in missing])
+
+            today = date.today().isoformat()
+            for row, sign, reading_type, error in parsed:
+                if error is None and (sign, reading_type) not in readings:
+                    error = f"GenerationFailed: no {reading_type} reading for {sign}"
+                if error is not None:
+                    record = {**row, "error": error}
+                    stats["errors"] += 1
+                else:
+                    record = {
+                        **row,
+                        "sign": sign,
+                        "reading_type": reading_type,
+                        "date": today,
+                        "horoscope": readings[(sign, reading_type)]
+                    }
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                stats["written"] += 1
+            out.flush()
+            stats["rows"] += len(batch)
+            _save_checkpoint(output_path, stats["rows"], out.tell())
+    return stats
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Generate readings for a CSV or JSONL list of users.")
+    parser.add_argument("input")
+    parser.add_argument("output")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="input format, guessed from the extension")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--rate", type=float, default=0.0, help="max generations started per second, 0 for no limit")
+    parser.add_argument("--window", type=int, default=DEFAULT_WINDOW, help="rows processed per checkpoint")
+    parser.add_argument("--resume", action="store_true", help="continue from the last checkpoint")
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES, help="retries per sign and reading type")
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ("csv" if args.input.lower().endswith(".csv") else "jsonl")
+
+    async def run():
+        try:
+            return await run_bulk(
+                args.input, args.output, fmt, args.concurrency, args.rate, args.window, args.resume, args.retries
+            )
+        finally:
+            await llm.shutdown()
+
+    stats = asyncio.run(run())
+    print(json.dumps(stats))
+    return 1 if stats["failed"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,68 @@
+"""In-memory cache for sign-level horoscope readings."""
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+
+DEFAULT_MAX_SIZE = 256
+# Five sections plus the lucky values for twelve signs, over today and tomorrow
+SECTION_CACHE_SIZE = 12 * 6 * 2
+
+
+def reading_cache_key(sign: str, reading_type: str, day: date) -> tuple:
+    """Build the cache key for a sign-level reading on a given day."""
+    return (sign, reading_type, day.isoformat())
+
+
+def section_cache_key(sign: str, section: str, day: date) -> tuple:
+    """Build the cache key for one section of a sign's readings, shared by reading types."""
+    return ("section", sign, section, day.isoformat())
+
+
+def next_local_midnight(day: date) -> float:
+    """Return the timestamp of local midnight at the end of the given day."""
+    return datetime.combine(day + timedelta(days=1), datetime.min.time()).timestamp()
+
+
+class ReadingCache:
+    """Bounded LRU cache whose entries expire at a fixed timestamp."""
+
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple):
+        """Return the cached reading for a key, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if time.time() >= expires_at:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: tuple, value: dict, expires_at: float) -> None:
+        """Store a reading until the given expiry timestamp."""
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop every cached reading."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+reading_cache = ReadingCache()
+# Sections for fan-out readings, kept apart so they never evict whole readings
+section_cache = ReadingCache(SECTION_CACHE_SIZE)
@@ -0,0 +1,149 @@
+"""Gzip and brotli response compression."""
+
+import gzip
+import zlib
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+MIN_SIZE = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+COMPRESSIBLE_TYPES = ("text/html", "text/css", "application/json", "application/javascript")
+
+
+def supported_encodings() -> list:
+    """Return the encodings this server can produce, most preferred first."""
+    return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+
+def choose_encoding(accept_encoding: str, available=None):
+    """Pick the best encoding the client accepts, or None for identity."""
+    accepted = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip().lower()] = quality
+    for encoding in available or supported_encodings():
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+def compress(body: bytes, encoding: str, best: bool = False) -> bytes:
+    """Compress a whole body; ``best`` trades CPU for size on static payloads."""
+    if encoding == "br":
+        return brotli.compress(body, quality=11 if best else BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=9 if best else GZIP_LEVEL, mtime=0)
+
+
+class _StreamCompressor:
+    """Compress a chunked body, flushing after each chunk so it stays live."""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        else:
+            self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def chunk(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.process(data) + self._compressor.flush()
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class CompressionMiddleware:
+    """ASGI middleware that compresses text responses on the fly.
+
+    Responses that already carry a Content-Encoding (such as precompressed
+    assets) pass through untouched, as do whole bodies below ``min_size``.
+    Streamed bodies are compressed chunk by chunk.
+    """
+
+    def __init__(self, app, min_size: int = MIN_SIZE):
+        self.app = app
+        self.min_size = min_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope["headers"])
+        encoding = choose_encoding(headers.get(b"accept-encoding", b"").decode("latin-1"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        compressor = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start, compressor, passthrough
+            if message["type"] == "http.response.start":
+                start = message
+                response_headers = {k.lower(): v for k, v in message.get("headers", [])}
+                content_type = response_headers.get(b"content-type", b"").decode("latin-1")
+                passthrough = (
+                    b"content-encoding" in response_headers
+                    or not content_type.startswith(COMPRESSIBLE_TYPES)
+                )
+                if passthrough:
+                    await send(message)
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is None and not more_body:
+                # Whole body in one message: compress it in one go, or skip it if small
+                if len(body) < self.min_size:
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+                data = compress(body, encoding)
+                await send(_with_encoding(start, encoding, len(data)))
+                await send({"type": "http.response.body", "body": data})
+                return
+            if compressor is None:
+                compressor = _StreamCompressor(encoding)
+                await send(_with_encoding(start, encoding))
+            data = compressor.chunk(body)
+            if not more_body:
+                data += compressor.finish()
+            await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
+
+
+def _with_encoding(start: dict, encoding: str, length=None) -> dict:
+    """Rewrite response headers for a compressed body."""
+    headers = []
+    vary = [b"Accept-Encoding"]
+    for key, value in start.get("headers", []):
+        if key.lower() == b"vary":
+            vary.insert(0, value)
+        elif key.lower() != b"content-length":
+            headers.append((key, value))
+    headers.append((b"content-encoding", encoding.encode("latin-1")))
+    headers.append((b"vary", b", ".join(vary)))
+    if length is not None:
+        headers.append((b"content-length", str(length).encode("latin-1")))
+    return {**start, "headers": headers}
@@ -0,0 +1,146 @@
+"""Precomputed readings served when generating fresh ones is not an option.
+
+The corpus holds, for every sign, a set of texts per section plus lucky
+values, and picks one per sign, section and day. It is served in degraded
+mode (see admission.py) and whenever generation fails, so visitors still
+get a reading written for their sign at no upstream cost.
+
+Build it offline with the configured backend and point CORPUS_PATH at it:
+
+    python -m app.corpus corpus.json --variants 31
+
+Without CORPUS_PATH a corpus is composed in memory by the local backend.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import zlib
+from datetime import date, timedelta
+
+from . import llm
+from .backends import compose_reading, get_backend
+from .zodiac import ZODIAC_SIGNS
+
+CORPUS_PATH = os.getenv("CORPUS_PATH", "")
+DEFAULT_VARIANTS = 31
+SECTIONS = ["general", "love", "career", "health", "advice"]
+
+
+class ReadingCorpus:
+    """Read-only readings indexed by sign and section."""
+
+    __slots__ = ("sections", "fields")
+
+    def __init__(self, data: dict):
+        # Tuples keep the structure compact and immutable
+        self.sections = {
+            sign: {section: tuple(texts) for section, texts in entry["sections"].items()}
+            for sign, entry in data["signs"].items()
+        }
+        self.fields = {sign: tuple(tuple(f) for f in entry["fields"]) for sign, entry in data["signs"].items()}
+
+    def reading(self, sign: str, sections: list, day: date) -> dict:
+        """Return the corpus reading of a sign for a day, the same all day long."""
+        horoscope = {"sections": {}}
+        for section in sections:
+            texts = self.sections[sign][section]
+            # crc32 rather than hash() so every worker picks the same text
+            offset = zlib.crc32(f"{sign}:{section}".encode())
+            horoscope["sections"][section] = texts[(day.toordinal() + offset) % len(texts)]
+        fields = self.fields[sign]
+        lucky_number, lucky_color, energy_level = fields[(day.toordinal() + zlib.crc32(sign.encode())) % len(fields)]
+        horoscope.update(lucky_number=lucky_number, lucky_color=lucky_color, energy_level=energy_level)
+        return horoscope
+
+
+def _add_reading(data: dict, sign: str, horoscope: dict) -> None:
+    entry = data["signs"].setdefault(sign, {"sections": {s: [] for s in SECTIONS}, "fields": []})
+    for section, text in horoscope["sections"].items():
+        if text not in entry["sections"][section]:
+            entry["sections"][section].append(text)
+    entry["fields"].append([horoscope["lucky_number"], horoscope["lucky_color"], horoscope["energy_level"]])
+
+
+def compose_corpus(variants: int = DEFAULT_VARIANTS) -> dict:
+    """Compose corpus data with the local backend, without any network call."""
+    data = {"signs": {}}
+    start = date(2000, 1, 1)
+    for sign in ZODIAC_SIGNS:
+        for i in range(variants):
+            day = start + timedelta(days=i)
+            _add_reading(data, sign, json.loads(compose_reading(sign, "comprehensive", day, SECTIONS)))
+    return data
+
+
+async def build_corpus(variants: int = DEFAULT_VARIANTS, concurrency: int = 8) -> dict:
+    """Generate corpus data with the configured backend, one comprehensive reading per variant."""
+    # Imported here because horoscope itself serves from the corpus
+    from .horoscope import _request_reading
+
+    backend = get_backend()
+    semaphore = asyncio.Semaphore(concurrency)
+    start = date.today()
+
+    async def one(sign: str, day: date):
+        async with semaphore:
+            try:
+                horoscope, _ = await _request_reading(sign, "comprehensive", day, backend=backend)
+            except Exception:
+                # Truncated or failed readings are left out rather than padded with fallback text
+                return sign, None
+            return sign, horoscope
+
+    data = {"signs": {}}
+    results = await asyncio.gather(*[
+        one(sign, start + timedelta(days=i)) for sign in ZODIAC_SIGNS for i in range(variants)
+    ])
+    for sign, horoscope in results:
+        if horoscope is not None:
+            _add_reading(data, sign, horoscope)
+    return data
+
+
+_corpus = None
+
+
+def get_corpus() -> ReadingCorpus:
+    """Return the corpus from CORPUS_PATH, or one composed locally if none is set."""
+    global _corpus
+    if _corpus is None:
+        if CORPUS_PATH:
+            with open(CORPUS_PATH, encoding="utf-8") as f:
+                _corpus = ReadingCorpus(json.load(f))
+        else:
+            _corpus = ReadingCorpus(compose_corpus())
+    return _corpus
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Build the precomputed reading corpus.")
+    parser.add_argument("output")
+    parser.add_argument("--variants", type=int, default=DEFAULT_VARIANTS, help="readings generated per sign")
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args(argv)
+
+    async def run():
+        try:
+            return await build_corpus(args.variants, args.concurrency)
+        finally:
+            await llm.shutdown()
+
+    data = asyncio.run(run())
+    missing = [sign for sign in ZODIAC_SIGNS if sign not in data["signs"]]
+    if missing:
+        # Every sign must be covered, so an incomplete corpus is never written
+        print(f"No readings for: {', '.join(missing)}; nothing written")
+        return 1
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+    print(f"Wrote {sum(len(e['fields']) for e in data['signs'].values())} readings to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,137 @@
+"""Export the site's non-personal pages as static files.
+
+    python -m app.export public --tomorrow
+    python -m app.export public --dry-run    # render everything, write nothing
+
+Writes the home page, the fingerprinted stylesheet and every sign × reading
+type page for the day, laid out by URL
+(``horoscope/leo/love/2026-10-18/index.html``). vercel.json serves
+``public/`` ahead of the function, so deploying after an export answers
+those pages without Python; run it as a daily job shortly before midnight
+with ``--tomorrow``, then deploy. Pages older than the day before are
+removed. A reading that cannot be generated is left out rather than
+exported as fallback text; the app still serves that page. A dry run
+generates with the local backend and writes no files, so stub pages never
+end up in a directory that gets deployed.
+
+Vercel compresses at its edge and ignores sibling files, so .gz and .br
+copies are only written with ``--precompressed``, for hosts that serve
+them as they are, such as nginx with ``gzip_static`` and ``brotli_static``.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+from datetime import date, timedelta
+
+from . import llm
+from .assets import Asset, _stylesheet, get_home_page, get_reading_page
+from .cache import reading_cache, reading_cache_key
+from .horoscope import READING_TYPES
+from .templates import STYLESHEET_HREF, reading_path
+from .warm import DEFAULT_CONCURRENCY, warm_readings
+from .zodiac import ZODIAC_SIGNS
+
+ENCODING_SUFFIXES = {"gzip": ".gz", "br": ".br"}
+
+
+def _write(path: str, data: bytes) -> None:
+    """Replace a file atomically, so a host never serves a half-written one."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def write_asset(output: str, url_path: str, asset: Asset, precompressed: bool = False, dry_run: bool = False) -> int:
+    """Write an asset for a URL path, with its compressed variants if asked; return the bytes written.
+
+    With ``dry_run`` nothing is written and the bytes that would be are returned.
+    """
+    relative = url_path.lstrip("/")
+    if not relative or url_path.endswith("/") or "." not in os.path.basename(relative):
+        relative = os.path.join(relative, "index.html")
+    path = os.path.join(output, relative)
+    files = [(path, asset.body)]
+    if precompressed:
+        files += [(path + ENCODING_SUFFIXES[encoding], body) for encoding, body in asset.variants.items()]
+    if not dry_run:
+        for file_path, body in files:
+            _write(file_path, body)
+    return sum(len(body) for _, body in files)
+
+
+def prune(output: str, day: date) -> int:
+    """Remove exported reading pages dated before the day before ``day``; return how many went."""
+    oldest = (day - timedelta(days=1)).isoformat()
+    removed = 0
+    for sign in ZODIAC_SIGNS:
+        for reading_type in READING_TYPES:
+            folder = os.path.join(output, "horoscope", sign, reading_type)
+            if not os.path.isdir(folder):
+                continue
+            for name in os.listdir(folder):
+                # ISO dates sort in date order
+                if name < oldest:
+                    shutil.rmtree(os.path.join(folder, name))
+                    removed += 1
+    return removed
+
+
+async def export_site(
+    output: str,
+    day: date,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    dry_run: bool = False,
+    precompressed: bool = False
+) -> dict:
+    """Generate a day's readings and write every static page to ``output``, or nothing in a dry run."""
+    results = await warm_readings(day, concurrency, dry_run=dry_run)
+    summary = {"date": day.isoformat(), "dry_run": dry_run, "pages": 0, "bytes": 0, "pruned": 0, "skipped": []}
+    summary["bytes"] += write_asset(output, "/", get_home_page(), precompressed, dry_run)
+    summary["bytes"] += write_asset(output, STYLESHEET_HREF, _stylesheet, precompressed, dry_run)
+
+    for result in results:
+        sign, reading_type = result["sign"], result["reading_type"]
+        horoscope = reading_cache.get(reading_cache_key(sign, reading_type, day))
+        if result["error"] or horoscope is None:
+            summary["skipped"].append(f"{sign}/{reading_type}")
+            continue
+        page = get_reading_page(sign, reading_type, day, horoscope)
+        summary["bytes"] += write_asset(output, reading_path(sign, reading_type, day), page, precompressed, dry_run)
+        summary["pages"] += 1
+    if not dry_run:
+        summary["pruned"] = prune(output, day)
+    return summary
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Export the home page and a day's reading pages as static files.")
+    parser.add_argument("output", help="directory to write the site into")
+    parser.add_argument("--date", type=date.fromisoformat, help="day to export (YYYY-MM-DD), default today")
+    parser.add_argument("--tomorrow", action="store_true", help="export the coming day")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--dry-run", action="store_true", help="use the local backend and write no files")
+    parser.add_argument("--precompressed", action="store_true", help="also write .gz and .br copies of every file")
+    args = parser.parse_args(argv)
+
+    day = args.date or date.today()
+    if args.tomorrow:
+        day = date.today() + timedelta(days=1)
+
+    async def run():
+        try:
+            return await export_site(args.output, day, args.concurrency, args.dry_run, args.precompressed)
+        finally:
+            await llm.shutdown()
+
+    summary = asyncio.run(run())
+    print(json.dumps(summary))
+    return 1 if summary["skipped"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,32 +1,58 @@
 """AI-powered horoscope generation service."""
 
+import asyncio
 import json
+import os
 import random
-from datetime import datetime
-from openai import OpenAI
+import time
+from contextlib import asynccontextmanager
+from datetime import date
 
+from . import llm
+from .admission import Lane
+from .backends import get_backend
+from .metrics import readings_served, stage
+from .corpus import get_corpus
+from .cache import next_local_midnight, reading_cache, reading_cache_key, section_cache, section_cache_key
+from .jsonstream import ReadingParser
+from .resilience import protected_call, protected_stream
+from .singleflight import SingleFlight
+from .store import get_store
 from .zodiac import get_sign_data
 
 READING_TYPES = {
     "daily": {
         "description": "a daily horoscope with general guidance for today",
-        "sections": ["general", "advice"]
+        "sections": ["general", "advice"],
+        "max_tokens": 250,
+        "concurrency": 32
     },
     "love": {
         "description": "a love and relationships focused horoscope",
-        "sections": ["love", "advice"]
+        "sections": ["love", "advice"],
+        "max_tokens": 250,
+        "concurrency": 32
     },
     "career": {
         "description": "a career and financial guidance horoscope",
-        "sections": ["career", "advice"]
+        "sections": ["career", "advice"],
+        "max_tokens": 250,
+        "concurrency": 32
     },
     "health": {
         "description": "a health and wellness focused horoscope",
-        "sections": ["health", "advice"]
+        "sections": ["health", "advice"],
+        "max_tokens": 250,
+        "concurrency": 32
     },
     "comprehensive": {
         "description": "a comprehensive horoscope covering all life areas",
-        "sections": ["general", "love", "career", "health", "advice"]
+        "sections": ["general", "love", "career", "health", "advice"],
+        "max_tokens": 650,
+        "concurrency": 8,
+        # Whole comprehensive readings normally take longer to come back
+        "latency_factor": 1.5,
+        "fan_out": True
     }
 }
 
@@ -38,6 +64,12 @@ READING_TITLES = {
     "comprehensive": "Your Complete Reading"
 }
 
+READING_FIELDS = ["lucky_number", "lucky_color", "energy_level"]
+
+# Generate the sections of fan-out reading types as separate concurrent requests
+SECTION_FANOUT = os.getenv("SECTION_FANOUT") == "1"
+SECTION_MAX_TOKENS = 160
+
 SECTION_ICONS = {
     "general": "🌟",
     "love": "💫",
@@ -46,6 +78,13 @@ SECTION_ICONS = {
     "advice": "💎"
 }
 
+_inflight = SingleFlight()
+# Generations per reading type run in separate lanes so slow types cannot starve quick ones
+_lanes = {
+    name: Lane(name, config["concurrency"], latency_factor=config.get("latency_factor", 1.0))
+    for name, config in READING_TYPES.items()
+}
+
 
 def get_reading_title(reading_type: str) -> str:
     """Get the display title for a reading type."""
@@ -57,72 +96,466 @@ def get_section_icon(section: str) -> str:
     return SECTION_ICONS.get(section, "✨")
 
 
-def generate_horoscope(
-    name: str,
-    sign: str,
-    birth_month: int,
-    birth_day: int,
-    birth_year: int,
-    reading_type: str = "daily"
-) -> dict:
-    """Generate a personalized horoscope using AI."""
+async def generate_horoscope(sign: str, reading_type: str = "daily") -> dict:
+    """Generate a horoscope using AI, reusing today's reading for the sign.
+
+    Reading content only depends on the sign, reading type and date, so it is
+    cached until local midnight, in memory and in the persistent store when
+    one is configured. The name and birth date are applied by the caller when
+    the reading is rendered.
+    """
+    if reading_type not in READING_TYPES:
+        reading_type = "daily"
+    today = date.today()
     
-    sign_data = get_sign_data(sign)
-    today = datetime.now().strftime("%B %d, %Y")
+    key = reading_cache_key(sign, reading_type, today)
+    cached = reading_cache.get(key)
+    if cached is not None:
+        readings_served.inc(source="cache")
+        return cached
     
-    reading_config = READING_TYPES.get(reading_type, READING_TYPES["daily"])
-    sections_needed = reading_config["sections"]
+    # Identical concurrent requests, streamed or not, share one upstream call
+    return await _inflight.do(key, lambda: _load_reading(sign, reading_type, today), collect=_reading_from_events)
+
+
+def is_final_reading(sign: str, reading_type: str, day: date) -> bool:
+    """Return whether the day's generated reading is cached, as opposed to a fallback being served."""
+    return reading_cache.get(reading_cache_key(sign, reading_type, day)) is not None
+
+
+async def _load_reading(sign: str, reading_type: str, day: date) -> dict:
+    """Read a reading through the store, or request and save it, falling back if the AI fails."""
+    stored = await _stored_reading(sign, reading_type, day)
+    if stored is not None:
+        readings_served.inc(source="store")
+        return stored
     
-    client = OpenAI()
+    if _lanes[reading_type].degraded():
+        readings_served.inc(source="corpus")
+        return _corpus_reading(sign, reading_type, day)
     
-    system_prompt = f"""You are an expert astrologer providing personalized horoscope readings. 
-You combine traditional astrological wisdom with insightful, empowering guidance.
+    try:
+        async with _generation_slot(reading_type):
+            if _fans_out(reading_type):
+                horoscope = await _collect(_request_sections(sign, reading_type, day))
+            else:
+                horoscope, _ = await _request_reading(sign, reading_type, day)
+    except PartialReadingError as exc:
+        # Serve what the model did write, but leave it uncached so the next request retries
+        readings_served.inc(source="partial")
+        return exc.horoscope
+    except Exception:
+        # Overload, timeouts and upstream errors fall back; the fallback is shared
+        # by every waiter but not cached, so the next request retries
+        readings_served.inc(source="fallback")
+        return _corpus_reading(sign, reading_type, day)
+    
+    readings_served.inc(source="llm")
+    await save_reading(sign, reading_type, day, horoscope)
+    return horoscope
 
-Today's date is {today}.
 
-The person asking is named {name}, born on {birth_month}/{birth_day}/{birth_year}, making them a {sign.title()} ({sign_data["element"]} sign).
-Key traits: {", ".join(sign_data.get("traits", []))}.
+def _queue_depth() -> int:
+    """Generations currently waiting for a slot, across all lanes."""
+    return sum(lane.waiting for lane in _lanes.values())
 
-Provide {reading_config["description"]}.
 
-Your response MUST be in this exact JSON format:
-{{
-    "sections": {{
-        {", ".join([f'"{s}": "2-3 sentences of insightful content"' for s in sections_needed])}
-    }},
-    "lucky_number": <number between 1-99>,
-    "lucky_color": "<a color name>",
-    "energy_level": <number between 60-100>
-}}
+@asynccontextmanager
+async def _generation_slot(reading_type: str):
+    """Hold a slot in the reading type's lane, reporting how long the upstream took to answer.
+
+    Yields a callable that streams call on their first fragment, so the lane
+    times the wait for an answer rather than the whole stream.
+    """
+    lane = _lanes[reading_type]
+    async with lane.slot():
+        started = time.perf_counter()
+        answered = []
+        try:
+            yield lambda: answered or answered.append(time.perf_counter())
+        finally:
+            lane.pressure.observe_latency((answered[0] if answered else time.perf_counter()) - started)
+
+
+def _corpus_reading(sign: str, reading_type: str, day: date) -> dict:
+    """Return the precomputed reading for a sign, type and day."""
+    return get_corpus().reading(sign, READING_TYPES[reading_type]["sections"], day)
+
+
+async def save_reading(sign: str, reading_type: str, day: date, horoscope: dict) -> None:
+    """Keep a generated reading in the cache and the persistent store until midnight."""
+    expires_at = next_local_midnight(day)
+    reading_cache.set(reading_cache_key(sign, reading_type, day), horoscope, expires_at)
+    if SECTION_FANOUT:
+        _cache_sections(sign, day, horoscope)
+    store = get_store()
+    if store is None:
+        return
+    try:
+        await asyncio.to_thread(store.put, sign, reading_type, day, horoscope, expires_at)
+    except Exception:
+        # The store only saves work; a failed write must not fail the request
+        pass
+
+
+async def _stored_reading(sign: str, reading_type: str, day: date):
+    """Look a reading up in the persistent store, promoting hits to the cache."""
+    store = get_store()
+    if store is None:
+        return None
+    try:
+        horoscope = await asyncio.to_thread(store.get, sign, reading_type, day)
+    except Exception:
+        return None
+    if horoscope is not None:
+        reading_cache.set(reading_cache_key(sign, reading_type, day), horoscope, next_local_midnight(day))
+    return horoscope
+
+
+async def stream_horoscope(sign: str, reading_type: str = "daily"):
+    """Yield the parts of a reading as soon as each one is complete.
+
+    Yields ``("section", name, text)`` for each section, then
+    ``("field", name, value)`` for the lucky number, lucky color and energy
+    level. A cached reading is replayed at once. Otherwise the completion is
+    streamed and parsed incrementally, and any parts still missing after a
+    failure come from the fallback reading.
+    """
+    if reading_type not in READING_TYPES:
+        reading_type = "daily"
+    today = date.today()
+    
+    key = reading_cache_key(sign, reading_type, today)
+    cached = reading_cache.get(key)
+    if cached is not None:
+        readings_served.inc(source="cache")
+        for event in _reading_events(cached):
+            yield event
+        return
+    
+    # Identical concurrent streams and plain requests share one upstream completion
+    stream = _inflight.stream(key, lambda: _stream_reading(sign, reading_type, today), replay=_reading_events)
+    async for event in stream:
+        yield event
+
+
+async def _stream_reading(sign: str, reading_type: str, day: date):
+    """Stream one reading from the store or the model, saving it once complete."""
+    stored = await _stored_reading(sign, reading_type, day)
+    if stored is not None:
+        readings_served.inc(source="store")
+        for event in _reading_events(stored):
+            yield event
+        return
+    
+    if _lanes[reading_type].degraded():
+        readings_served.inc(source="corpus")
+        for event in _reading_events(_corpus_reading(sign, reading_type, day)):
+            yield event
+        return
+    
+    sections_needed = READING_TYPES[reading_type]["sections"]
+    received = {"sections": {}}
+    emitted = set()
+    complete = True
+    
+    try:
+        async with _generation_slot(reading_type) as answered:
+            if _fans_out(reading_type):
+                events = _request_sections(sign, reading_type, day)
+            else:
+                events = _stream_completion(sign, reading_type, day, answered)
+            async for kind, name, value in events:
+                answered()
+                if name in sections_needed or name in READING_FIELDS:
+                    emitted.add(name)
+                    if kind == "section":
+                        received["sections"][name] = value
+                    else:
+                        received[name] = value
+                    yield kind, name, value
+    except PartialReadingError:
+        # Every part was sent, but some came from the corpus, so it must not be saved
+        complete = False
+    except Exception:
+        # Overload, timeouts, an open circuit and upstream errors all finish from the fallback
+        pass
+    
+    if complete and all(s in received["sections"] for s in sections_needed) and all(f in received for f in READING_FIELDS):
+        horoscope = {
+            "sections": {s: received["sections"][s] for s in sections_needed},
+            **{f: received[f] for f in READING_FIELDS}
+        }
+        readings_served.inc(source="llm")
+        await save_reading(sign, reading_type, day, horoscope)
+        return
+    
+    # Finish the reading from the corpus; it is not cached so the next request retries
+    readings_served.inc(source="partial" if emitted else "fallback")
+    for kind, name, value in _reading_events(_corpus_reading(sign, reading_type, day)):
+        if name not in emitted:
+            yield kind, name, value
+
+
+async def _stream_completion(sign: str, reading_type: str, day: date, answered=None):
+    """Stream one completion for a whole reading, yielding its parts as they are parsed.
+
+    ``answered`` is called on every fragment, for the lane to time the first one.
+    """
+    parser = ReadingParser()
+    with stage("prompt"):
+        prompt = _build_prompt(sign, reading_type, day)
+    backend = get_backend()
+    with stage("llm"):
+        async for fragment in protected_stream(lambda: backend.open_stream(prompt)):
+            if answered is not None:
+                answered()
+            for event in parser.feed(fragment):
+                yield event
+
+
+def _fans_out(reading_type: str) -> bool:
+    """Return whether a reading type is generated one section per request."""
+    return SECTION_FANOUT and READING_TYPES[reading_type].get("fan_out", False)
+
+
+def _cache_sections(sign: str, day: date, horoscope: dict) -> None:
+    """Cache each section and the lucky values on their own, for fan-out readings to reuse."""
+    expires_at = next_local_midnight(day)
+    for section, text in horoscope["sections"].items():
+        section_cache.set(section_cache_key(sign, section, day), text, expires_at)
+    if section_cache.get(section_cache_key(sign, "lucky", day)) is None:
+        lucky = {f: horoscope[f] for f in READING_FIELDS}
+        section_cache.set(section_cache_key(sign, "lucky", day), lucky, expires_at)
+
+
+async def _request_section(sign: str, reading_type: str, day: date, section: str) -> dict:
+    """Generate a single section with its own small token budget, caching it on its own."""
+    horoscope, _ = await _request_reading(sign, reading_type, day, sections=[section])
+    _cache_sections(sign, day, horoscope)
+    return horoscope
+
+
+async def _request_sections(sign: str, reading_type: str, day: date):
+    """Yield a reading's parts, generating every uncached section concurrently.
+
+    Sections already cached, whichever reading type produced them, are
+    reused. Sections are yielded in order as soon as each one is ready,
+    followed by the lucky values. If any section failed it is filled from
+    the corpus, and PartialReadingError is raised once everything is yielded.
+    """
+    sections = READING_TYPES[reading_type]["sections"]
+    cached = {s: section_cache.get(section_cache_key(sign, s, day)) for s in sections}
+    tasks = {
+        s: asyncio.ensure_future(_request_section(sign, reading_type, day, s))
+        for s in sections if cached[s] is None
+    }
+    lucky = section_cache.get(section_cache_key(sign, "lucky", day))
+    horoscope = {"sections": {}}
+    failed = False
+    try:
+        for section in sections:
+            text = cached[section]
+            if section in tasks:
+                try:
+                    generated = await tasks[section]
+                except Exception:
+                    failed = True
+                    text = _corpus_reading(sign, reading_type, day)["sections"][section]
+                else:
+                    text = generated["sections"][section]
+                    lucky = lucky or {f: generated[f] for f in READING_FIELDS}
+            horoscope["sections"][section] = text
+            yield "section", section, text
+    finally:
+        for task in tasks.values():
+            task.cancel()
+    
+    if lucky is None:
+        lucky = {f: value for f, value in _corpus_reading(sign, reading_type, day).items() if f in READING_FIELDS}
+    horoscope.update(lucky)
+    for field in READING_FIELDS:
+        yield "field", field, horoscope[field]
+    if failed:
+        raise PartialReadingError(horoscope)
+
+
+async def _collect(events) -> dict:
+    """Gather streamed reading parts into a reading dict."""
+    return _reading_from_events([event async for event in events])
+
+
+def _reading_from_events(events: list) -> dict:
+    """Build a reading dict from parts shaped like stream_horoscope's."""
+    horoscope = {"sections": {}}
+    for kind, name, value in events:
+        if kind == "section":
+            horoscope["sections"][name] = value
+        else:
+            horoscope[name] = value
+    return horoscope
+
+
+def _reading_events(horoscope: dict):
+    """Yield a complete reading in the same shape as stream_horoscope."""
+    for section, content in horoscope["sections"].items():
+        yield "section", section, content
+    for field in READING_FIELDS:
+        yield "field", field, horoscope[field]
+
+
+def _build_prompt(sign: str, reading_type: str, day: date, sections: list = None) -> dict:
+    """Collect everything a generation backend needs for one reading.
+
+    ``sections`` narrows the request to some of the reading type's sections.
+    """
+    sections = sections or READING_TYPES[reading_type]["sections"]
+    return {
+        "sign": sign,
+        "reading_type": reading_type,
+        "day": day,
+        "sections": sections,
+        "messages": _build_messages(sign, reading_type, day, sections),
+        "options": _completion_options(sign, reading_type, sections)
+    }
+
+
+def _build_messages(sign: str, reading_type: str, day: date, sections_needed: list) -> list:
+    """Build the chat messages asking for a sign-level reading.
+
+    The system prompt only depends on the sign and reading type, and
+    everything shared by all readings comes first, so OpenAI's prompt cache
+    can reuse the longest possible prefix. The date goes last, in the user
+    message.
+    """
+    sign_data = get_sign_data(sign)
+    reading_config = READING_TYPES[reading_type]
+    
+    system_prompt = f"""You are an expert astrologer providing horoscope readings. 
+You combine traditional astrological wisdom with insightful, empowering guidance.
 
 Guidelines:
 - Be specific and insightful, not generic
-- Reference {sign.title()} traits naturally
+- Reference the sign's traits naturally
 - Be encouraging but realistic
 - Use vivid, evocative language
 - Keep each section 2-3 meaningful sentences
-- Return ONLY valid JSON, no other text"""
+- Address the reader directly as "you"
+- Return ONLY valid JSON, no other text
 
-    messages = [
+Respond in JSON with:
+- "sections": one entry per requested section, each 2-3 sentences of insightful content
+- "lucky_number": a number between 1 and 99
+- "lucky_color": a color name
+- "energy_level": a number between 60 and 100
+
+The reading is for {sign.title()} ({sign_data["element"]} sign).
+Key traits: {", ".join(sign_data.get("traits", []))}.
+
+Provide {reading_config["description"]}.
+Sections: {", ".join(f'"{s}"' for s in sections_needed)}."""
+
+    return [
         {"role": "system", "content": system_prompt},
-        {"role": "user", "content": f"Please provide my {reading_type} horoscope reading."}
+        {"role": "user", "content": f"Today's date is {day.strftime('%B %d, %Y')}. Please provide the {reading_type} horoscope reading."}
     ]
-    
+
+
+def _completion_options(sign: str, reading_type: str, sections: list) -> dict:
+    """Return the model settings for a reading type, with a schema-enforced reply."""
+    reading_config = READING_TYPES[reading_type]
+    # A single fan-out section gets a budget of its own rather than the whole reading's
+    max_tokens = reading_config["max_tokens"] if sections == reading_config["sections"] else SECTION_MAX_TOKENS
+    return {
+        "model": llm.MODEL,
+        "temperature": 0.8,
+        "max_tokens": max_tokens,
+        # Routes requests sharing a system prompt to the same prompt cache
+        "extra_body": {"prompt_cache_key": f"horoscope:{sign}:{reading_type}"},
+        "response_format": {
+            "type": "json_schema",
+            "json_schema": {
+                "name": "horoscope",
+                "strict": True,
+                "schema": _reading_schema(sections)
+            }
+        }
+    }
+
+
+def _reading_schema(sections: list) -> dict:
+    """Build the JSON schema of a reading with the given sections."""
+    return {
+        "type": "object",
+        "properties": {
+            "sections": {
+                "type": "object",
+                "properties": {s: {"type": "string"} for s in sections},
+                "required": list(sections),
+                "additionalProperties": False
+            },
+            "lucky_number": {"type": "integer"},
+            "lucky_color": {"type": "string"},
+            "energy_level": {"type": "integer"}
+        },
+        "required": ["sections", *READING_FIELDS],
+        "additionalProperties": False
+    }
+
+
+class PartialReadingError(Exception):
+    """The model's reply was cut short; carries the reading pieced together from it."""
+
+    def __init__(self, horoscope: dict):
+        super().__init__("reading is missing sections")
+        self.horoscope = horoscope
+
+
+def _parse_reading(content: str, sections_needed: list) -> dict:
+    """Parse the model's reply, salvaging the complete parts of truncated JSON.
+
+    Missing lucky values are filled in from the fallback. If any section is
+    missing, raises PartialReadingError with the fallback filling the gaps.
+    """
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=messages,
-            temperature=0.8,
-            max_tokens=500
-        )
-        horoscope = json.loads(response.choices[0].message.content)
-    except Exception:
-        # Fallback response if AI fails
-        horoscope = _get_fallback_horoscope(sections_needed)
+        data = json.loads(content)
+    except ValueError:
+        parser = ReadingParser()
+        parser.feed(content)
+        data = parser.result()
+    if not isinstance(data, dict):
+        data = {}
+    sections = data.get("sections")
+    if not isinstance(sections, dict):
+        sections = {}
     
+    fallback = _get_fallback_horoscope(sections_needed)
+    horoscope = {
+        "sections": {s: sections.get(s) or fallback["sections"][s] for s in sections_needed},
+        **{f: data.get(f, fallback[f]) for f in READING_FIELDS}
+    }
+    if not all(sections.get(s) for s in sections_needed):
+        raise PartialReadingError(horoscope)
     return horoscope
 
 
+async def _request_reading(sign: str, reading_type: str, day: date, backend=None, sections: list = None) -> tuple:
+    """Ask the generation backend for the sign-level reading of a given day.
+
+    Returns the parsed reading together with the completion's token usage,
+    which is None for backends that do not report any. ``sections`` narrows
+    the request to some of the reading type's sections.
+    """
+    backend = backend or get_backend()
+    with stage("prompt"):
+        prompt = _build_prompt(sign, reading_type, day, sections)
+    with stage("llm"):
+        content, usage = await protected_call(lambda: backend.complete(prompt))
+    with stage("parse"):
+        horoscope = _parse_reading(content, prompt["sections"])
+    return horoscope, usage
+
+
 def _get_fallback_horoscope(sections: list) -> dict:
     """Generate a fallback horoscope if AI is unavailable."""
     fallback_content = {
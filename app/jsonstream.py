@@ -0,0 +1,106 @@
+"""Incremental parser for horoscope JSON as it streams from the model."""
+
+import json
+
+SCALAR_END = ",}] \t\r\n"
+
+
+class ReadingParser:
+    """Pick completed values out of a partially received horoscope JSON.
+
+    Feed text as it arrives; each call returns the values finished by that
+    chunk as ``("section", name, text)`` for entries of ``"sections"`` and
+    ``("field", name, value)`` for top-level fields such as ``lucky_number``.
+    Anything before the opening brace, such as a code fence, is ignored.
+    """
+
+    def __init__(self):
+        self.sections = {}
+        self.fields = {}
+        self.done = False
+        self._stack = []
+        self._key = None
+        self._expect_key = False
+        self._string = None
+        self._escape = False
+        self._scalar = None
+
+    def feed(self, text: str) -> list:
+        """Consume more text and return the values it completed."""
+        events = []
+        for ch in text:
+            if self.done:
+                break
+            if self._string is not None:
+                self._string.append(ch)
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    raw, self._string = "".join(self._string), None
+                    self._on_string(json.loads(raw), events)
+                continue
+            if self._scalar is not None:
+                if ch not in SCALAR_END:
+                    self._scalar.append(ch)
+                    continue
+                raw, self._scalar = "".join(self._scalar), None
+                self._on_value(_parse_scalar(raw), events)
+            if not self._stack:
+                if ch == "{":
+                    self._open("object")
+                continue
+            if ch == '"':
+                self._string = [ch]
+            elif ch == "{":
+                self._open("object")
+            elif ch == "[":
+                self._open("array")
+            elif ch in "}]":
+                self._close()
+            elif ch == ":":
+                self._expect_key = False
+            elif ch == ",":
+                self._expect_key = self._stack[-1][0] == "object"
+            elif not ch.isspace():
+                self._scalar = [ch]
+        return events
+
+    def result(self) -> dict:
+        """Return everything parsed so far in the horoscope dict shape."""
+        return {"sections": dict(self.sections), **self.fields}
+
+    def _open(self, kind: str) -> None:
+        self._stack.append((kind, self._key))
+        self._key = None
+        self._expect_key = kind == "object"
+
+    def _close(self) -> None:
+        _, self._key = self._stack.pop()
+        self._expect_key = False
+        if not self._stack:
+            self.done = True
+
+    def _on_string(self, value: str, events: list) -> None:
+        if self._expect_key and self._stack[-1][0] == "object":
+            self._key = value
+            return
+        self._on_value(value, events)
+
+    def _on_value(self, value, events: list) -> None:
+        depth = len(self._stack)
+        if depth == 1 and self._key != "sections":
+            self.fields[self._key] = value
+            events.append(("field", self._key, value))
+        elif depth == 2 and self._stack[1][1] == "sections" and isinstance(value, str):
+            self.sections[self._key] = value
+            events.append(("section", self._key, value))
+
+
+def _parse_scalar(raw: str):
+    """Decode a bare JSON number or literal, keeping the raw text if invalid."""
+    try:
+        return json.loads(raw)
+    except ValueError:
+        return raw
@@ -0,0 +1,85 @@
+"""Shared AsyncOpenAI client with a pooled, keep-alive HTTP connection."""
+
+import os
+
+from openai import DEFAULT_CONNECTION_LIMITS, AsyncOpenAI, DefaultAsyncHttpxClient, OpenAIError, Timeout
+
+MODEL = "gpt-4o-mini"
+
+MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "200"))
+MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("OPENAI_MAX_KEEPALIVE_CONNECTIONS", "50"))
+KEEPALIVE_EXPIRY = float(os.getenv("OPENAI_KEEPALIVE_EXPIRY", "30"))
+CONNECT_TIMEOUT = float(os.getenv("OPENAI_CONNECT_TIMEOUT", "5"))
+REQUEST_TIMEOUT = float(os.getenv("OPENAI_REQUEST_TIMEOUT", "30"))
+MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "2"))
+
+_client = None
+
+
+def _create_client() -> AsyncOpenAI:
+    """Build an AsyncOpenAI client on top of a tuned connection pool."""
+    # The SDK may sit on httpx or httpx2; build the limits with whichever class it uses
+    limits = type(DEFAULT_CONNECTION_LIMITS)(
+        max_connections=MAX_CONNECTIONS,
+        max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=KEEPALIVE_EXPIRY
+    )
+    return AsyncOpenAI(
+        http_client=DefaultAsyncHttpxClient(limits=limits),
+        timeout=Timeout(REQUEST_TIMEOUT, connect=CONNECT_TIMEOUT),
+        max_retries=MAX_RETRIES
+    )
+
+
+def startup() -> None:
+    """Create the shared client; called once when the app starts."""
+    global _client
+    if _client is None:
+        try:
+            _client = _create_client()
+        except OpenAIError:
+            # No API key configured; generation falls back until one is set
+            _client = None
+
+
+async def shutdown() -> None:
+    """Close the shared client and its pooled connections."""
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
+
+
+def get_client() -> AsyncOpenAI:
+    """Return the shared client, creating it if the app lifespan did not."""
+    global _client
+    if _client is None:
+        _client = _create_client()
+    return _client
+
+
+# Running token totals, including how many prompt tokens hit OpenAI's prompt cache
+usage_totals = {"completions": 0, "prompt_tokens": 0, "cached_tokens": 0, "completion_tokens": 0}
+
+
+def cached_tokens(usage) -> int:
+    """Return how many of a completion's prompt tokens were served from cache."""
+    details = getattr(usage, "prompt_tokens_details", None)
+    return getattr(details, "cached_tokens", 0) or 0
+
+
+def record_usage(usage) -> None:
+    """Add a completion's token usage to the running totals."""
+    if usage is None:
+        return
+    usage_totals["completions"] += 1
+    usage_totals["prompt_tokens"] += usage.prompt_tokens
+    usage_totals["cached_tokens"] += cached_tokens(usage)
+    usage_totals["completion_tokens"] += usage.completion_tokens
+
+
+def prompt_cache_hit_rate() -> float:
+    """Return the share of prompt tokens served from OpenAI's prompt cache."""
+    if not usage_totals["prompt_tokens"]:
+        return 0.0
+    return usage_totals["cached_tokens"] / usage_totals["prompt_tokens"]
@@ -1,52 +1,225 @@
 """Main FastAPI application with route handlers."""
 
-from fastapi import FastAPI, Form
-from fastapi.responses import HTMLResponse
+import asyncio
+import json
+import os
+from contextlib import asynccontextmanager
+from datetime import date
+from urllib.parse import quote
+
+from fastapi import FastAPI, Form, HTTPException, Request
+from fastapi.responses import HTMLResponse, PlainTextResponse, RedirectResponse, StreamingResponse
+
+from . import llm, metrics
+from .admission import charge_generation
+from .corpus import get_corpus
+from .api import router as api_router
+from .compression import CompressionMiddleware
+from .assets import (
+    HOME_CACHE_CONTROL,
+    IMMUTABLE_CACHE_CONTROL,
+    PROVISIONAL_CACHE_CONTROL,
+    asset_response,
+    get_home_page,
+    get_reading_page,
+    get_stylesheet,
+    reading_cache_control
+)
+from .warm import schedule_daily_warmup, warm_readings
+from .zodiac import ZODIAC_SIGNS, get_zodiac_sign
+from .horoscope import (
+    READING_TYPES,
+    _inflight,
+    _lanes,
+    _queue_depth,
+    generate_horoscope,
+    is_final_reading,
+    stream_horoscope
+)
+from .resilience import breaker
+from .templates import (
+    GUEST_NAME,
+    reading_path,
+    render_cosmic_numbers,
+    render_reading_head,
+    render_reading_section,
+    render_reading_tail
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open the shared OpenAI client on startup and close it on shutdown."""
+    llm.startup()
+    # Render and precompress the home page before the first request
+    get_home_page()
+    # Load the precomputed readings now so degraded mode never waits on them
+    get_corpus()
+    background = []
+    if os.getenv("WARM_ON_STARTUP") == "1":
+        background.append(asyncio.create_task(warm_readings(date.today())))
+    if os.getenv("WARM_SCHEDULE") == "1":
+        background.append(asyncio.create_task(schedule_daily_warmup()))
+    yield
+    for task in background:
+        task.cancel()
+    await llm.shutdown()
 
-from .zodiac import get_zodiac_sign
-from .horoscope import generate_horoscope
-from .templates import render_home_page, render_reading_page
 
 app = FastAPI(
     title="Celestial Horoscope",
     description="AI-Powered Zodiac Readings",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
+app.add_middleware(CompressionMiddleware)
+# Added last so it is outermost and times compression too
+app.add_middleware(metrics.MetricsMiddleware)
+app.include_router(api_router)
+
+for _name in ("prompt_tokens", "cached_tokens", "completion_tokens"):
+    metrics.gauge(
+        f"llm_{_name}_total",
+        f"{_name.replace('_', ' ').capitalize()} reported by the model.",
+        lambda name=_name: llm.usage_totals[name],
+        kind="counter"
+    )
+metrics.gauge("reading_cache_hit_ratio", "Share of readings served from cache or store.", metrics.cache_hit_ratio)
+metrics.gauge("llm_prompt_cache_hit_ratio", "Share of prompt tokens served from the prompt cache.", llm.prompt_cache_hit_rate)
+metrics.gauge("reading_fallback_ratio", "Share of readings that used fallback content.", metrics.fallback_ratio)
+metrics.gauge("llm_circuit_open", "1 while the circuit breaker refuses upstream calls.", lambda: float(breaker.state != "closed"))
+metrics.gauge("lane_queue_depth", "Generations waiting for a lane slot.", _queue_depth)
+metrics.gauge(
+    "degraded_lanes",
+    "Reading types currently served from the precomputed corpus.",
+    lambda: float(sum(lane.pressure.active for lane in _lanes.values()))
+)
+metrics.gauge("readings_in_flight", "Readings currently being generated.", _inflight.in_flight)
+
+
+def _label_reading_type(reading_type: str) -> None:
+    """Label the request's metrics with its reading type, bounding label values."""
+    metrics.label_request(reading_type=reading_type if reading_type in READING_TYPES else "other")
+
+
+def _sign_or_400(month: int, day: int) -> str:
+    """Calculate the zodiac sign, rejecting impossible birth dates."""
+    try:
+        with metrics.stage("zodiac"):
+            return get_zodiac_sign(month, day)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
 
 
 @app.get("/", response_class=HTMLResponse)
-def home():
-    """Render the home page with birth details form."""
-    return render_home_page()
+async def home(request: Request):
+    """Serve the pre-rendered home page with birth details form."""
+    return asset_response(get_home_page(), request, HOME_CACHE_CONTROL)
+
 
+@app.get("/static/styles.{fingerprint}.css")
+async def stylesheet(fingerprint: str, request: Request):
+    """Serve the fingerprinted base stylesheet."""
+    asset = get_stylesheet(fingerprint)
+    if asset is None:
+        raise HTTPException(status_code=404)
+    return asset_response(asset, request, IMMUTABLE_CACHE_CONTROL)
 
-@app.post("/horoscope", response_class=HTMLResponse)
-def get_horoscope(
+
+@app.post("/horoscope")
+async def get_horoscope(
     name: str = Form(...),
     month: int = Form(...),
     day: int = Form(...),
     year: int = Form(...),
     reading_type: str = Form("daily")
 ):
-    """Generate and display a personalized horoscope."""
-    # Calculate zodiac sign from birth date
-    sign = get_zodiac_sign(month, day)
+    """Send the visitor to today's cacheable reading page for their sign.
+
+    The name goes in the URL fragment, which browsers keep across the
+    redirect but never send on, so the page itself stays the same for
+    everyone with the sign and can be served from the edge.
+    """
+    sign = _sign_or_400(month, day)
+    if reading_type not in READING_TYPES:
+        reading_type = "daily"
+    url = reading_path(sign, reading_type, date.today()) + "#name=" + quote(name, safe="")
+    return RedirectResponse(url, status_code=303)
+
+
+@app.get("/horoscope/{sign}/{reading_type}/{day}", response_class=HTMLResponse)
+async def reading_page(sign: str, reading_type: str, day: str, request: Request):
+    """Serve a sign's reading for the day, cacheable by CDNs until the day ends.
+
+    Once the reading has been generated the page is rendered and compressed
+    once and served with an ETag. Before that, the page shell is sent
+    straight away and each section follows as soon as it has been generated.
+    """
+    if sign not in ZODIAC_SIGNS or reading_type not in READING_TYPES:
+        raise HTTPException(status_code=404)
+    _label_reading_type(reading_type)
+    today = date.today()
+    if day != today.isoformat():
+        # Readings only exist for the current day
+        return RedirectResponse(
+            reading_path(sign, reading_type, today),
+            status_code=307,
+            headers={"Cache-Control": PROVISIONAL_CACHE_CONTROL}
+        )
     
-    # Generate AI-powered horoscope
-    horoscope = generate_horoscope(
-        name=name,
-        sign=sign,
-        birth_month=month,
-        birth_day=day,
-        birth_year=year,
-        reading_type=reading_type
+    if is_final_reading(sign, reading_type, today):
+        horoscope = await generate_horoscope(sign, reading_type)
+        with metrics.stage("render"):
+            page = get_reading_page(sign, reading_type, today, horoscope)
+        return asset_response(page, request, reading_cache_control(today))
+    charge_generation(request)
+    
+    async def page():
+        with metrics.stage("render"):
+            head = render_reading_head(GUEST_NAME, sign, reading_type)
+        yield head
+        fields = {}
+        async for kind, key, value in stream_horoscope(sign, reading_type):
+            if kind == "section":
+                with metrics.stage("render"):
+                    section = render_reading_section(key, value)
+                yield section
+            else:
+                fields[key] = value
+        with metrics.stage("render"):
+            tail = render_cosmic_numbers(fields) + render_reading_tail()
+        yield tail
+    
+    return StreamingResponse(
+        page(),
+        media_type="text/html; charset=utf-8",
+        headers={"Cache-Control": PROVISIONAL_CACHE_CONTROL}
     )
+
+
+@app.get("/horoscope/stream")
+async def stream_reading(request: Request, month: int, day: int, reading_type: str = "daily"):
+    """Stream a horoscope as Server-Sent Events, one event per completed part."""
+    _label_reading_type(reading_type)
+    if reading_type not in READING_TYPES:
+        reading_type = "daily"
+    sign = _sign_or_400(month, day)
+    if not is_final_reading(sign, reading_type, date.today()):
+        charge_generation(request)
+    
+    async def events():
+        async for kind, name, value in stream_horoscope(sign, reading_type):
+            yield f"event: {kind}\ndata: {json.dumps({'name': name, 'value': value})}\n\n"
+        yield f"event: done\ndata: {json.dumps({'sign': sign, 'reading_type': reading_type})}\n\n"
     
-    # Render the reading page
-    return render_reading_page(
-        name=name,
-        sign=sign,
-        reading_type=reading_type,
-        horoscope=horoscope
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
     )
 
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Expose request, stage and token metrics in the Prometheus text format."""
+    return PlainTextResponse(metrics.render_prometheus(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,219 @@
+"""Lightweight request metrics: stage timers, Server-Timing and Prometheus output.
+
+Wrap a piece of work in ``with stage("render"):`` to time it. The duration
+goes into a per-stage histogram and, if the stage finished before the
+response headers went out, into that response's Server-Timing header.
+``render_prometheus()`` renders everything in the Prometheus text format for
+the /metrics endpoint.
+"""
+
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+INF_BUCKET = 'le="+Inf"'
+LATENCY_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_registry = []
+_gauges = []
+_current = ContextVar("request_timings", default=None)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _label_text(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    """Monotonic counter with optional labels."""
+
+    def __init__(self, name: str, help_text: str, labels: tuple = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.values = {}
+        _registry.append(self)
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = tuple(labels.get(name, "") for name in self.labels)
+        self.values[key] = self.values.get(key, 0.0) + amount
+
+    def total(self) -> float:
+        return sum(self.values.values())
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for key, value in self.values.items():
+            lines.append(f"{self.name}{_label_text(self.labels, key)} {value:g}")
+        return lines
+
+
+class Histogram:
+    """Fixed-bucket histogram with optional labels."""
+
+    def __init__(self, name: str, help_text: str, labels: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.buckets = buckets
+        self.values = {}
+        _registry.append(self)
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(labels.get(name, "") for name in self.labels)
+        series = self.values.get(key)
+        if series is None:
+            series = self.values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for key, (counts, total, count) in self.values.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = 'le="' + format(bound, "g") + '"'
+                lines.append(f"{self.name}_bucket{_label_text(self.labels, key, le)} {cumulative}")
+            lines.append(f"{self.name}_bucket{_label_text(self.labels, key, INF_BUCKET)} {count}")
+            lines.append(f"{self.name}_sum{_label_text(self.labels, key)} {total:g}")
+            lines.append(f"{self.name}_count{_label_text(self.labels, key)} {count}")
+        return lines
+
+
+def gauge(name: str, help_text: str, read, kind: str = "gauge") -> None:
+    """Register a metric whose value is read from ``read()`` at scrape time."""
+    _gauges.append((name, help_text, read, kind))
+
+
+request_duration = Histogram(
+    "http_request_duration_seconds",
+    "Time from request to the end of the response body.",
+    ("route", "method", "status", "reading_type")
+)
+stage_duration = Histogram(
+    "stage_duration_seconds",
+    "Time spent in each processing stage.",
+    ("stage",)
+)
+readings_served = Counter(
+    "readings_served_total",
+    "Readings served, by where they came from (cache, store, llm, corpus, partial or fallback).",
+    ("source",)
+)
+
+
+def _served(*sources) -> float:
+    return sum(readings_served.values.get((source,), 0.0) for source in sources)
+
+
+def cache_hit_ratio() -> float:
+    """Share of readings served from the cache or store rather than generated."""
+    total = readings_served.total()
+    return _served("cache", "store") / total if total else 0.0
+
+
+def fallback_ratio() -> float:
+    """Share of readings that were wholly or partly fallback content."""
+    total = readings_served.total()
+    return _served("fallback", "partial") / total if total else 0.0
+
+
+class _RequestTimings:
+    """Stage durations and labels collected while one request is handled."""
+
+    __slots__ = ("stages", "labels")
+
+    def __init__(self):
+        self.stages = {}
+        self.labels = {}
+
+    def server_timing(self, total: float) -> bytes:
+        parts = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in self.stages.items()]
+        parts.append(f"total;dur={total * 1000:.2f}")
+        return ", ".join(parts).encode("latin-1")
+
+
+class stage:
+    """Context manager timing one processing stage."""
+
+    __slots__ = ("name", "started")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self.started
+        stage_duration.observe(elapsed, stage=self.name)
+        timings = _current.get()
+        if timings is not None:
+            timings.stages[self.name] = timings.stages.get(self.name, 0.0) + elapsed
+        return False
+
+
+def label_request(**labels) -> None:
+    """Attach labels, such as the reading type, to the current request's metrics."""
+    timings = _current.get()
+    if timings is not None:
+        timings.labels.update(labels)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request latency and adding Server-Timing."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        timings = _RequestTimings()
+        token = _current.set(timings)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", timings.server_timing(time.perf_counter() - started)))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            route = scope.get("route")
+            request_duration.observe(
+                time.perf_counter() - started,
+                route=getattr(route, "path", "unmatched"),
+                method=scope["method"],
+                status=str(status),
+                reading_type=timings.labels.get("reading_type", "")
+            )
+            _current.reset(token)
+
+
+def render_prometheus() -> str:
+    """Render every metric in the Prometheus text exposition format."""
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    for name, help_text, read, kind in _gauges:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        lines.append(f"{name} {read():g}")
+    return "\n".join(lines) + "\n"
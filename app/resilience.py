@@ -0,0 +1,148 @@
+"""Deadlines, circuit breaking and request hedging around the model call.
+
+Tuned through environment variables:
+
+- LLM_DEADLINE: seconds a reading may take before it falls back (default 8)
+- BREAKER_FAILURES: consecutive failures that open the circuit (default 5)
+- BREAKER_RESET: seconds the circuit stays open before a probe (default 30)
+- LLM_HEDGE_AFTER: seconds before a duplicate request is raced against a
+  slow one; 0 disables hedging (default 0)
+"""
+
+import asyncio
+import os
+import time
+
+DEADLINE = float(os.getenv("LLM_DEADLINE", "8"))
+BREAKER_FAILURES = int(os.getenv("BREAKER_FAILURES", "5"))
+BREAKER_RESET = float(os.getenv("BREAKER_RESET", "30"))
+HEDGE_AFTER = float(os.getenv("LLM_HEDGE_AFTER", "0"))
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling upstream while the circuit is open."""
+
+
+class CircuitBreaker:
+    """Stop calling upstream after repeated failures, then probe to recover.
+
+    Closed: every call goes through. After ``failure_threshold`` consecutive
+    failures the circuit opens and calls are refused at once. Once
+    ``reset_timeout`` has passed it goes half-open and lets a single probe
+    through; the probe's outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold: int = BREAKER_FAILURES, reset_timeout: float = BREAKER_RESET):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+
+    def allow(self) -> bool:
+        """Return whether a call may go upstream right now."""
+        if self.state == "closed":
+            return True
+        if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self.state = "half_open"
+        if self.state == "half_open" and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.state = "closed"
+        self.failures = 0
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._probing = False
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+    def record_abandoned(self) -> None:
+        """Forget a call that was cancelled before it finished either way."""
+        self._probing = False
+
+
+breaker = CircuitBreaker()
+
+
+async def hedged(call, hedge_after: float):
+    """Run ``call()``, racing a second attempt if the first is slow.
+
+    The first attempt to succeed wins and the other is cancelled. If both
+    fail, the last error is raised.
+    """
+    tasks = [asyncio.ensure_future(call())]
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+        if not done:
+            tasks.append(asyncio.ensure_future(call()))
+        pending = set(tasks)
+        error = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def protected_call(call, deadline: float = DEADLINE, hedge_after: float = HEDGE_AFTER):
+    """Call upstream under the circuit breaker, a deadline and optional hedging.
+
+    Raises CircuitOpenError straight away while the circuit is open, and
+    TimeoutError once the deadline passes, so callers can fall back fast.
+    """
+    if not breaker.allow():
+        raise CircuitOpenError("circuit open, skipping upstream call")
+    attempt = (lambda: hedged(call, hedge_after)) if hedge_after > 0 else call
+    try:
+        result = await asyncio.wait_for(attempt(), deadline)
+    except Exception:
+        breaker.record_failure()
+        raise
+    except BaseException:
+        breaker.record_abandoned()
+        raise
+    breaker.record_success()
+    return result
+
+
+async def protected_stream(open_stream, deadline: float = DEADLINE):
+    """Yield the items of an upstream stream under the circuit breaker and a deadline.
+
+    The deadline covers opening the stream and receiving every item. The
+    stream is closed however iteration ends.
+    """
+    if not breaker.allow():
+        raise CircuitOpenError("circuit open, skipping upstream call")
+    loop = asyncio.get_running_loop()
+    ends_at = loop.time() + deadline
+    end = object()
+    try:
+        stream = await asyncio.wait_for(open_stream(), deadline)
+        try:
+            iterator = aiter(stream)
+            while True:
+                item = await asyncio.wait_for(anext(iterator, end), max(ends_at - loop.time(), 0))
+                if item is end:
+                    break
+                yield item
+        finally:
+            await stream.close()
+    except Exception:
+        breaker.record_failure()
+        raise
+    except BaseException:
+        breaker.record_abandoned()
+        raise
+    breaker.record_success()
@@ -0,0 +1,99 @@
+"""Coalesce concurrent calls for the same key into one upstream call."""
+
+import asyncio
+
+
+class SingleFlight:
+    """Run at most one call per key at a time and share its result.
+
+    The first caller for a key starts the call as a task; later callers for
+    the same key wait on that task instead of starting their own. The call is
+    shielded, so a caller that disconnects does not cancel it for the rest.
+
+    Plain calls and streams for a key share one registry: given ``collect``,
+    a plain call joins a running stream and builds its result from the
+    items, and given ``replay``, a stream joins a running call and yields
+    the items of its result.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._streams = {}
+
+    async def do(self, key, fn, collect=None):
+        """Return the result of ``fn()``, sharing it with concurrent callers.
+
+        If a stream for the key is already running and ``collect`` is given,
+        returns ``collect(items)`` for that stream's items instead.
+        """
+        task = self._calls.get(key)
+        if task is None:
+            broadcast = self._streams.get(key)
+            if broadcast is not None and collect is not None:
+                return collect([item async for item in broadcast.subscribe()])
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def stream(self, key, fn, replay=None):
+        """Yield the items of ``fn()``, sharing one run with concurrent callers.
+
+        Callers that join late first receive the items already produced, then
+        follow along live. If a plain call for the key is already running and
+        ``replay`` is given, yields ``replay(result)`` once it finishes instead.
+        """
+        broadcast = self._streams.get(key)
+        if broadcast is None:
+            task = self._calls.get(key)
+            if task is not None and replay is not None:
+                for item in replay(await asyncio.shield(task)):
+                    yield item
+                return
+            broadcast = _Broadcast()
+            self._streams[key] = broadcast
+            task = asyncio.ensure_future(broadcast.drain(fn()))
+            task.add_done_callback(lambda _: self._streams.pop(key, None))
+        async for item in broadcast.subscribe():
+            yield item
+
+    def in_flight(self) -> int:
+        """Return the number of keys with a call currently running."""
+        return len(self._calls) + len(self._streams)
+
+
+class _Broadcast:
+    """Replay the items of one async iterator to any number of subscribers."""
+
+    def __init__(self):
+        self.items = []
+        self.closed = False
+        self.error = None
+        self._changed = asyncio.Event()
+
+    async def drain(self, iterator) -> None:
+        try:
+            async for item in iterator:
+                self.items.append(item)
+                self._notify()
+        except Exception as exc:
+            self.error = exc
+        finally:
+            self.closed = True
+            self._notify()
+
+    async def subscribe(self):
+        index = 0
+        while True:
+            while index < len(self.items):
+                yield self.items[index]
+                index += 1
+            if self.closed:
+                if self.error is not None:
+                    raise self.error
+                return
+            await self._changed.wait()
+
+    def _notify(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
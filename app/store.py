@@ -0,0 +1,130 @@
+"""Persistent storage for generated readings, shared across processes.
+
+Set READING_STORE_PATH to a SQLite file to share readings between the
+uvicorn workers of one host and keep them across restarts of that host.
+Without it only the in-process cache is used.
+
+The file only helps processes on the same machine. On Vercel /tmp belongs
+to a single instance and is empty after a cold start, so covering cold
+starts or several instances still needs a networked store.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import date
+
+STORE_PATH = os.getenv("READING_STORE_PATH", "")
+BUSY_TIMEOUT_MS = 5000
+CLEANUP_EVERY = 500
+
+logger = logging.getLogger(__name__)
+
+
+class ReadingStore:
+    """Interface for a reading store keyed by sign, reading type and date."""
+
+    def get(self, sign: str, reading_type: str, day: date):
+        """Return the stored reading, or None if missing or expired."""
+        raise NotImplementedError
+
+    def put(self, sign: str, reading_type: str, day: date, horoscope: dict, expires_at: float) -> None:
+        """Store a reading until the given expiry timestamp."""
+        raise NotImplementedError
+
+    def cleanup(self) -> int:
+        """Delete expired readings and return how many were removed."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Release any open resources."""
+
+
+class SQLiteReadingStore(ReadingStore):
+    """Reading store in an embedded SQLite database running in WAL mode.
+
+    WAL lets readers in any process proceed while one writer commits, and the
+    busy timeout makes concurrent writers wait instead of failing. Each thread
+    gets its own connection, since calls arrive through ``asyncio.to_thread``.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._writes = 0
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            """CREATE TABLE IF NOT EXISTS readings (
+                sign TEXT NOT NULL,
+                reading_type TEXT NOT NULL,
+                day TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                PRIMARY KEY (sign, reading_type, day)
+            )"""
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS readings_expiry ON readings (expires_at)")
+        conn.commit()
+        self.cleanup()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_MS / 1000)
+            conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, sign: str, reading_type: str, day: date):
+        row = self._connection().execute(
+            "SELECT payload FROM readings WHERE sign = ? AND reading_type = ? AND day = ? AND expires_at > ?",
+            (sign, reading_type, day.isoformat(), time.time())
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, sign: str, reading_type: str, day: date, horoscope: dict, expires_at: float) -> None:
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO readings (sign, reading_type, day, payload, expires_at) VALUES (?, ?, ?, ?, ?)",
+                (sign, reading_type, day.isoformat(), json.dumps(horoscope), expires_at)
+            )
+        self._writes += 1
+        if self._writes % CLEANUP_EVERY == 0:
+            self.cleanup()
+
+    def cleanup(self) -> int:
+        conn = self._connection()
+        with conn:
+            return conn.execute("DELETE FROM readings WHERE expires_at <= ?", (time.time(),)).rowcount
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+_store = None
+_store_failed = False
+
+
+def get_store():
+    """Return the configured reading store, or None if none is configured or it cannot be opened.
+
+    A store that fails to open is reported once and left disabled, so every
+    request does not retry it; readings are then only cached in memory.
+    """
+    global _store, _store_failed
+    if _store is None and STORE_PATH and not _store_failed:
+        try:
+            _store = SQLiteReadingStore(STORE_PATH)
+        except sqlite3.Error as exc:
+            _store_failed = True
+            logger.error("Reading store %s could not be opened, continuing without it: %s", STORE_PATH, exc)
+    return _store
@@ -1,14 +1,21 @@
 """HTML templates and styling for the horoscope app."""
 
+import hashlib
 from datetime import datetime
 from .zodiac import ZODIAC_SIGNS, get_element_colors
 from .horoscope import get_reading_title, get_section_icon
 
 
 def get_base_styles() -> str:
-    """Return the base CSS styles."""
+    """Return the base CSS styles as an inline style block."""
+    return f"""
+    <style>{get_base_css()}</style>
+    """
+
+
+def get_base_css() -> str:
+    """Return the base CSS shared by every page."""
     return """
-    <style>
         @import url('https://fonts.googleapis.com/css2?family=Playfair+Display:ital,wght@0,400;0,700;1,400&family=Raleway:wght@300;400;500;600&display=swap');
         
         * {
@@ -370,10 +377,21 @@ def get_base_styles() -> str:
             .sign-meta { flex-direction: column; gap: 10px; }
             .cosmic-numbers { grid-template-columns: 1fr; }
         }
-    </style>
     """
 
 
+# Content-hashed URL of the base stylesheet, so it can be cached forever
+STYLESHEET_HREF = f"/static/styles.{hashlib.sha256(get_base_css().encode('utf-8')).hexdigest()[:12]}.css"
+
+# Shown until the page fills in the visitor's name from the URL fragment
+GUEST_NAME = "Stargazer"
+
+
+def reading_path(sign: str, reading_type: str, day) -> str:
+    """Return the canonical, cacheable URL path of a sign-level reading."""
+    return f"/horoscope/{sign}/{reading_type}/{day.isoformat()}"
+
+
 def render_home_page() -> str:
     """Render the home page HTML."""
     zodiac_icons = "".join([
@@ -400,7 +418,7 @@ def render_home_page() -> str:
         <meta name="viewport" content="width=device-width, initial-scale=1.0">
         <title>Celestial Horoscope · Your Daily Star Guide</title>
         <link rel="icon" href="data:image/svg+xml,<svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 100 100'><text y='.9em' font-size='90'>⭐</text></svg>">
-        {get_base_styles()}
+        <link rel="stylesheet" href="{STYLESHEET_HREF}">
     </head>
     <body>
         <div class="starfield"></div>
@@ -475,22 +493,28 @@ def render_reading_page(
     horoscope: dict
 ) -> str:
     """Render the horoscope reading page HTML."""
+    sections_html = "".join(
+        render_reading_section(section, content)
+        for section, content in horoscope["sections"].items()
+    )
+    return (
+        render_reading_head(name, sign, reading_type)
+        + sections_html
+        + render_cosmic_numbers(horoscope)
+        + render_reading_tail()
+    )
+
+
+def render_reading_head(name: str, sign: str, reading_type: str) -> str:
+    """Render the reading page up to the first section.
+
+    This part only depends on the sign, so it can be sent before the
+    horoscope has been generated.
+    """
     sign_data = ZODIAC_SIGNS[sign]
     element = sign_data["element"]
     colors = get_element_colors(element)
     
-    # Build sections HTML
-    sections_html = ""
-    for section, content in horoscope["sections"].items():
-        icon = get_section_icon(section)
-        title = section.replace("_", " ").title()
-        sections_html += f"""
-        <div class="reading-section">
-            <h3>{icon} {title}</h3>
-            <p class="reading-text">{content}</p>
-        </div>
-        """
-    
     return f"""
     <!DOCTYPE html>
     <html lang="en">
@@ -499,7 +523,7 @@ def render_reading_page(
         <meta name="viewport" content="width=device-width, initial-scale=1.0">
         <title>{name}'s {sign.title()} Horoscope · Celestial Horoscope</title>
         <link rel="icon" href="data:image/svg+xml,<svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 100 100'><text y='.9em' font-size='90'>⭐</text></svg>">
-        {get_base_styles()}
+        <link rel="stylesheet" href="{STYLESHEET_HREF}">
         <style>
             .sign-symbol {{ color: {colors["primary"]}; text-shadow: 0 0 30px {colors["glow"]}; }}
             .sign-name {{ color: {colors["primary"]}; }}
@@ -521,14 +545,29 @@ def render_reading_page(
                     </div>
                 </div>
                 
-                <p class="greeting">Welcome, {name}. The cosmos has a message for you...</p>
+                <p class="greeting">Welcome, <span class="reader-name">{name}</span>. The cosmos has a message for you...</p>
                 
                 <h2 style="text-align: center; font-family: 'Playfair Display', serif; color: var(--gold-accent); margin-bottom: 30px;">
                     {get_reading_title(reading_type)}
                 </h2>
-                
-                {sections_html}
-                
+                """
+
+
+def render_reading_section(section: str, content: str) -> str:
+    """Render one section block of a reading."""
+    icon = get_section_icon(section)
+    title = section.replace("_", " ").title()
+    return f"""
+        <div class="reading-section">
+            <h3>{icon} {title}</h3>
+            <p class="reading-text">{content}</p>
+        </div>
+        """
+
+
+def render_cosmic_numbers(horoscope: dict) -> str:
+    """Render the lucky number, lucky color and energy level block."""
+    return f"""
                 <div class="cosmic-numbers">
                     <div class="cosmic-number">
                         <div class="label">Lucky Number</div>
@@ -543,7 +582,17 @@ def render_reading_page(
                         <div class="value">{horoscope["energy_level"]}%</div>
                     </div>
                 </div>
-                
+                """
+
+
+def render_reading_tail() -> str:
+    """Render the closing part of the reading page.
+
+    The page is the same for everyone with the sign, so the script fills in
+    the visitor's name from the ``#name=`` fragment, which never reaches the
+    server or a cache.
+    """
+    return f"""
                 <a href="/" class="back-link">← Get Another Reading</a>
             </div>
             
@@ -551,7 +600,16 @@ def render_reading_page(
                 ⭐ Powered by AI & Ancient Astrological Wisdom ⭐
             </footer>
         </div>
+        <script>
+            (function () {{
+                var match = location.hash.match(/name=([^&]*)/);
+                if (!match) return;
+                var name = decodeURIComponent(match[1]).trim().slice(0, 60);
+                if (!name) return;
+                document.querySelectorAll(".reader-name").forEach(function (el) {{ el.textContent = name; }});
+                document.title = document.title.replace("{GUEST_NAME}", name);
+            }})();
+        </script>
     </body>
     </html>
     """
-
@@ -0,0 +1,207 @@
+"""Pre-generate ("warm the sky") every sign and reading type for a day.
+
+Run it from the command line to check a day's readings ahead of time:
+
+    python -m app.warm --tomorrow --concurrency 8 --retries 2
+    python -m app.warm --dry-run
+
+or let the app warm the cache itself by setting WARM_ON_STARTUP=1 (warms
+today when the app starts) and WARM_SCHEDULE=1 (warms tomorrow shortly before
+each midnight rollover). With READING_STORE_PATH set, readings warmed from
+the command line are saved to the shared store the app reads from.
+
+Readings already in the cache or the store are skipped, and generation
+goes through the same single-flight layer as visitors' requests, so a
+warm-up never pays twice for a reading.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from datetime import date, datetime, timedelta
+from functools import partial
+
+from . import llm
+from .backends import LocalBackend
+from .cache import next_local_midnight, reading_cache, reading_cache_key
+from .horoscope import (
+    READING_TYPES,
+    _corpus_reading,
+    _inflight,
+    _reading_from_events,
+    _request_reading,
+    _stored_reading,
+    save_reading
+)
+from .zodiac import ZODIAC_SIGNS
+
+DEFAULT_CONCURRENCY = 8
+DEFAULT_RETRIES = 2
+RETRY_BACKOFF = 0.5
+WARM_LEAD_MINUTES = int(os.getenv("WARM_LEAD_MINUTES", "30"))
+
+
+async def _save_in_memory(sign: str, reading_type: str, day: date, horoscope: dict) -> None:
+    """Cache a reading in this process only, keeping stub output out of the shared store."""
+    reading_cache.set(reading_cache_key(sign, reading_type, day), horoscope, next_local_midnight(day))
+
+
+async def _generate(sign: str, reading_type: str, day: date, request, save, outcome: dict) -> dict:
+    """Generate and save one reading, recording its usage or error in ``outcome``.
+
+    Visitors may join this call through the single-flight layer, so like
+    any generation it returns the corpus reading rather than raising.
+    """
+    try:
+        horoscope, usage = await request(sign, reading_type, day)
+    except Exception as exc:
+        outcome["error"] = f"{type(exc).__name__}: {exc}"
+        return _corpus_reading(sign, reading_type, day)
+    outcome["usage"] = usage
+    await save(sign, reading_type, day, horoscope)
+    return horoscope
+
+
+async def _warm_one(sign: str, reading_type: str, day: date, request, save, retries: int, semaphore) -> dict:
+    """Generate and cache one reading unless it already is, retrying with exponential backoff."""
+    result = {
+        "sign": sign,
+        "reading_type": reading_type,
+        "skipped": None,
+        "attempts": 0,
+        "latency_ms": None,
+        "prompt_tokens": 0,
+        "cached_tokens": 0,
+        "completion_tokens": 0,
+        "error": None
+    }
+    key = reading_cache_key(sign, reading_type, day)
+    async with semaphore:
+        if reading_cache.get(key) is not None:
+            result["skipped"] = "cache"
+            return result
+        if await _stored_reading(sign, reading_type, day) is not None:
+            result["skipped"] = "store"
+            return result
+        for attempt in range(retries + 1):
+            result["attempts"] = attempt + 1
+            started = time.perf_counter()
+            outcome = {}
+            await _inflight.do(
+                key,
+                lambda: _generate(sign, reading_type, day, request, save, outcome),
+                collect=_reading_from_events
+            )
+            # Joining a visitor's call reports no outcome; the cache tells whether it succeeded
+            if outcome.get("error") or reading_cache.get(key) is None:
+                result["error"] = outcome.get("error") or "no reading was generated"
+                if attempt < retries:
+                    await asyncio.sleep(RETRY_BACKOFF * 2 ** attempt)
+                continue
+            result["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+            result["error"] = None
+            usage = outcome.get("usage")
+            if usage is not None:
+                result["prompt_tokens"] = usage.prompt_tokens
+                result["cached_tokens"] = llm.cached_tokens(usage)
+                result["completion_tokens"] = usage.completion_tokens
+            break
+    return result
+
+
+async def warm_readings(
+    day: date,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    retries: int = DEFAULT_RETRIES,
+    dry_run: bool = False
+) -> list:
+    """Generate all sign × reading-type readings for a day into the cache.
+
+    Returns one report entry per combination with its latency, token usage
+    and final error, if any.
+    """
+    request, save = _request_reading, save_reading
+    if dry_run:
+        request, save = partial(_request_reading, backend=LocalBackend()), _save_in_memory
+    semaphore = asyncio.Semaphore(concurrency)
+    return await asyncio.gather(*[
+        _warm_one(sign, reading_type, day, request, save, retries, semaphore)
+        for sign in ZODIAC_SIGNS
+        for reading_type in READING_TYPES
+    ])
+
+
+def summarize(results: list) -> dict:
+    """Aggregate a warm-up report into totals."""
+    latencies = sorted(r["latency_ms"] for r in results if r["latency_ms"] is not None)
+    return {
+        "total": len(results),
+        "skipped": sum(1 for r in results if r["skipped"]),
+        "failed": sum(1 for r in results if r["error"]),
+        "retried": sum(1 for r in results if r["attempts"] > 1),
+        "prompt_tokens": sum(r["prompt_tokens"] for r in results),
+        "cached_tokens": sum(r["cached_tokens"] for r in results),
+        "completion_tokens": sum(r["completion_tokens"] for r in results),
+        "p50_ms": latencies[len(latencies) // 2] if latencies else None,
+        "max_ms": latencies[-1] if latencies else None
+    }
+
+
+async def schedule_daily_warmup(lead_minutes: int = WARM_LEAD_MINUTES) -> None:
+    """Warm tomorrow's readings shortly before every local midnight."""
+    while True:
+        today = date.today()
+        warm_at = next_local_midnight(today) - lead_minutes * 60
+        delay = warm_at - time.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+            await warm_readings(today + timedelta(days=1))
+        else:
+            # Past this day's warm-up window; wait for the next one
+            await asyncio.sleep(next_local_midnight(today) - time.time() + 1)
+
+
+def _print_report(results: list) -> None:
+    """Print one line per combination followed by the summary."""
+    for r in results:
+        latency = f"{r['latency_ms']:>8.1f} ms" if r["latency_ms"] is not None else "       - ms"
+        tokens = f"{r['prompt_tokens']:>5}({r['cached_tokens']} cached)+{r['completion_tokens']:<4} tok"
+        status = r["error"] or (f"already in {r['skipped']}" if r["skipped"] else "ok")
+        print(f"{r['sign']:<12} {r['reading_type']:<14} {latency}  {tokens}  x{r['attempts']}  {status}")
+    print(json.dumps(summarize(results)))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Pre-generate every sign and reading type for a day.")
+    parser.add_argument("--date", type=date.fromisoformat, help="day to generate (YYYY-MM-DD), default today")
+    parser.add_argument("--tomorrow", action="store_true", help="generate the coming day")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES)
+    parser.add_argument("--dry-run", action="store_true", help="use the local backend and keep readings in memory")
+    parser.add_argument("--json", action="store_true", help="print the full report as JSON")
+    args = parser.parse_args(argv)
+
+    day = args.date or date.today()
+    if args.tomorrow:
+        day = date.today() + timedelta(days=1)
+
+    async def run():
+        try:
+            return await warm_readings(day, args.concurrency, args.retries, args.dry_run)
+        finally:
+            await llm.shutdown()
+
+    started = datetime.now()
+    results = asyncio.run(run())
+    if args.json:
+        print(json.dumps({"date": day.isoformat(), "results": results, "summary": summarize(results)}, indent=2))
+    else:
+        print(f"Warmed {day.isoformat()} in {(datetime.now() - started).total_seconds():.1f}s")
+        _print_report(results)
+    return 1 if any(r["error"] for r in results) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
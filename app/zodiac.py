@@ -1,6 +1,9 @@
 """Zodiac sign data and calculation utilities."""
 
-from datetime import datetime
+try:
+    import numpy as np
+except ImportError:  # numpy is in requirements.txt; without it bulk lookups loop in Python
+    np = None
 
 ZODIAC_SIGNS = {
     "aries": {
@@ -113,32 +116,90 @@ ELEMENT_COLORS = {
 }
 
 
+# Day each sign starts on, in calendar order; a sign runs until the next one starts
+SIGN_START_DATES = [
+    (1, 20, "aquarius"),
+    (2, 19, "pisces"),
+    (3, 21, "aries"),
+    (4, 20, "taurus"),
+    (5, 21, "gemini"),
+    (6, 21, "cancer"),
+    (7, 23, "leo"),
+    (8, 23, "virgo"),
+    (9, 23, "libra"),
+    (10, 23, "scorpio"),
+    (11, 22, "sagittarius"),
+    (12, 22, "capricorn")
+]
+
+SIGN_NAMES = list(ZODIAC_SIGNS)
+
+# Feb 29 is allowed, so the table covers a leap year
+DAYS_IN_MONTH = [31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
+MONTH_OFFSETS = [sum(DAYS_IN_MONTH[:i]) for i in range(12)]
+
+
+def _build_day_table() -> list:
+    """Map every day of a leap year to the index of its sign in SIGN_NAMES."""
+    starts = {MONTH_OFFSETS[m - 1] + d - 1: SIGN_NAMES.index(sign) for m, d, sign in SIGN_START_DATES}
+    table = []
+    current = SIGN_NAMES.index("capricorn")
+    for day_of_year in range(sum(DAYS_IN_MONTH)):
+        current = starts.get(day_of_year, current)
+        table.append(current)
+    return table
+
+
+SIGN_INDEX_BY_DAY = _build_day_table()
+
+if np is not None:
+    _DAYS_IN_MONTH_ARRAY = np.array(DAYS_IN_MONTH, dtype=np.int64)
+    _MONTH_OFFSETS_ARRAY = np.array(MONTH_OFFSETS, dtype=np.int64)
+    _SIGN_INDEX_BY_DAY_ARRAY = np.array(SIGN_INDEX_BY_DAY, dtype=np.int8)
+
+
+def is_valid_birthday(month: int, day: int) -> bool:
+    """Check that a month and day form a real calendar date (Feb 29 allowed)."""
+    return 1 <= month <= 12 and 1 <= day <= DAYS_IN_MONTH[month - 1]
+
+
 def get_zodiac_sign(month: int, day: int) -> str:
     """Calculate zodiac sign from birth month and day."""
-    if (month == 3 and day >= 21) or (month == 4 and day <= 19):
-        return "aries"
-    elif (month == 4 and day >= 20) or (month == 5 and day <= 20):
-        return "taurus"
-    elif (month == 5 and day >= 21) or (month == 6 and day <= 20):
-        return "gemini"
-    elif (month == 6 and day >= 21) or (month == 7 and day <= 22):
-        return "cancer"
-    elif (month == 7 and day >= 23) or (month == 8 and day <= 22):
-        return "leo"
-    elif (month == 8 and day >= 23) or (month == 9 and day <= 22):
-        return "virgo"
-    elif (month == 9 and day >= 23) or (month == 10 and day <= 22):
-        return "libra"
-    elif (month == 10 and day >= 23) or (month == 11 and day <= 21):
-        return "scorpio"
-    elif (month == 11 and day >= 22) or (month == 12 and day <= 21):
-        return "sagittarius"
-    elif (month == 12 and day >= 22) or (month == 1 and day <= 19):
-        return "capricorn"
-    elif (month == 1 and day >= 20) or (month == 2 and day <= 18):
-        return "aquarius"
-    else:
-        return "pisces"
+    if not is_valid_birthday(month, day):
+        raise ValueError(f"Invalid birth date: month {month}, day {day}")
+    return SIGN_NAMES[SIGN_INDEX_BY_DAY[MONTH_OFFSETS[month - 1] + day - 1]]
+
+
+def get_zodiac_sign_indices(months, days):
+    """Classify many birthdays at once, returning indices into SIGN_NAMES.
+
+    Takes equal-length sequences (or numpy arrays) of months and days. With
+    numpy installed, as requirements.txt asks, this is a single vectorized
+    pass returning an array; otherwise it falls back to a per-row loop
+    returning a list, which is much slower for large inputs. Raises ValueError if any date is
+    invalid, naming the first offending position.
+    """
+    if np is None:
+        indices = []
+        for position, (month, day) in enumerate(zip(months, days, strict=True)):
+            if not is_valid_birthday(month, day):
+                raise ValueError(f"Invalid birth date at position {position}: month {month}, day {day}")
+            indices.append(SIGN_INDEX_BY_DAY[MONTH_OFFSETS[month - 1] + day - 1])
+        return indices
+
+    months = np.asarray(months, dtype=np.int64)
+    days = np.asarray(days, dtype=np.int64)
+    if months.shape != days.shape:
+        raise ValueError("months and days must have the same shape")
+    month_index = np.clip(months - 1, 0, 11)
+    valid = (months >= 1) & (months <= 12) & (days >= 1) & (days <= _DAYS_IN_MONTH_ARRAY[month_index])
+    if not valid.all():
+        position = int(np.flatnonzero(~valid.ravel())[0])
+        raise ValueError(
+            f"Invalid birth date at position {position}: "
+            f"month {months.ravel()[position]}, day {days.ravel()[position]}"
+        )
+    return _SIGN_INDEX_BY_DAY_ARRAY[_MONTH_OFFSETS_ARRAY[month_index] + days - 1]
 
 
 def get_sign_data(sign: str) -> dict:
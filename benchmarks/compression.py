@@ -0,0 +1,88 @@
+"""Bytes-on-wire and CPU cost of response compression per payload.
+
+    python benchmarks/compression.py [--json results.json]
+
+Static payloads (home page, stylesheet) are precompressed once at the best
+ratio, so their per-request CPU cost is zero; reading pages are compressed
+on the fly at the default levels.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.compression import BROTLI_QUALITY, GZIP_LEVEL, compress, supported_encodings  # noqa: E402
+from app.horoscope import _get_fallback_horoscope, READING_TYPES  # noqa: E402
+from app.templates import get_base_css, render_home_page, render_reading_page  # noqa: E402
+
+
+def _payloads() -> dict:
+    horoscope = _get_fallback_horoscope(READING_TYPES["comprehensive"]["sections"])
+    return {
+        "home_page (static)": (render_home_page().encode("utf-8"), True),
+        "stylesheet (static)": (get_base_css().encode("utf-8"), True),
+        "reading_page (dynamic)": (
+            render_reading_page("Ada", "leo", "comprehensive", horoscope).encode("utf-8"),
+            False
+        ),
+    }
+
+
+def _time_us(fn, rounds: int) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - started) / rounds * 1e6
+
+
+def run(rounds: int) -> list:
+    results = []
+    for name, (body, static) in _payloads().items():
+        for encoding in supported_encodings():
+            for best in (False, True):
+                data = compress(body, encoding, best=best)
+                cpu_us = _time_us(lambda: compress(body, encoding, best=best), rounds)
+                level = ("11" if encoding == "br" else "9") if best else (
+                    str(BROTLI_QUALITY) if encoding == "br" else str(GZIP_LEVEL)
+                )
+                served = best == static
+                results.append({
+                    "payload": name,
+                    "encoding": f"{encoding}-{level}",
+                    "raw_bytes": len(body),
+                    "wire_bytes": len(data),
+                    "ratio": round(len(data) / len(body), 3),
+                    "compress_us": round(cpu_us, 1),
+                    "per_request_us": 0.0 if static else round(cpu_us, 1),
+                    "served": served
+                })
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args(argv)
+
+    results = run(args.rounds)
+    print(f"{'payload':<24} {'encoding':<9} {'raw':>7} {'wire':>7} {'ratio':>6} {'cpu/op':>10} {'cpu/req':>10}")
+    for r in results:
+        marker = "*" if r["served"] else " "
+        print(
+            f"{r['payload']:<24} {r['encoding']:<9} {r['raw_bytes']:>7} {r['wire_bytes']:>7} "
+            f"{r['ratio']:>6} {r['compress_us']:>8.1f}us {r['per_request_us']:>8.1f}us {marker}"
+        )
+    print("* = what the app serves")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
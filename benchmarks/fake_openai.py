@@ -0,0 +1,131 @@
+"""Local stand-in for the OpenAI chat completions API, for load tests.
+
+    FAKE_OPENAI_LATENCY=0.8 uvicorn --app-dir benchmarks fake_openai:app --port 8011
+
+Point the app at it with OPENAI_BASE_URL=http://127.0.0.1:8011/v1. Replies
+follow the requested JSON schema, streamed or not, and carry token usage.
+Tuned through environment variables:
+
+- FAKE_OPENAI_LATENCY: median seconds per completion (default 0.8)
+- FAKE_OPENAI_SIGMA: spread of a log-normal latency; 0 keeps it fixed (default 0.3)
+- FAKE_OPENAI_ERROR_RATE: share of calls answered with a 500 (default 0)
+
+GET /stats returns how many completions were served.
+"""
+
+import asyncio
+import json
+import math
+import os
+import random
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+LATENCY = float(os.getenv("FAKE_OPENAI_LATENCY", "0.8"))
+SIGMA = float(os.getenv("FAKE_OPENAI_SIGMA", "0.3"))
+ERROR_RATE = float(os.getenv("FAKE_OPENAI_ERROR_RATE", "0"))
+# Share of the latency spent before the first streamed chunk
+FIRST_CHUNK_SHARE = 0.3
+CHUNK_SIZE = 12
+
+app = FastAPI()
+stats = {"completions": 0, "streamed": 0, "errors": 0}
+
+
+def _latency() -> float:
+    if LATENCY > 0 and SIGMA > 0:
+        return random.lognormvariate(math.log(LATENCY), SIGMA)
+    return LATENCY
+
+
+def _content(body: dict) -> str:
+    """Compose a reply matching the sections the request's schema asks for."""
+    schema = body.get("response_format", {}).get("json_schema", {}).get("schema", {})
+    sections = schema.get("properties", {}).get("sections", {}).get("required", ["general", "advice"])
+    return json.dumps({
+        "sections": {
+            s: f"The {s} outlook is steady today. Small, deliberate choices carry further than usual."
+            for s in sections
+        },
+        "lucky_number": random.randint(1, 99),
+        "lucky_color": random.choice(["Gold", "Silver", "Azure", "Emerald"]),
+        "energy_level": random.randint(60, 100)
+    })
+
+
+def _usage(body: dict, content: str) -> dict:
+    prompt_tokens = sum(len(m.get("content", "")) for m in body.get("messages", [])) // 4
+    completion_tokens = len(content) // 4
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+        "prompt_tokens_details": {"cached_tokens": prompt_tokens // 128 * 128}
+    }
+
+
+def _chunk(completion_id: str, model: str, delta: dict, finish_reason=None, usage=None) -> str:
+    chunk = {
+        "id": completion_id,
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [] if usage else [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+    }
+    if usage:
+        chunk["usage"] = usage
+    return f"data: {json.dumps(chunk)}\n\n"
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    model = body.get("model", "gpt-4o-mini")
+    completion_id = f"chatcmpl-{random.getrandbits(64):016x}"
+    latency = _latency()
+    if random.random() < ERROR_RATE:
+        await asyncio.sleep(latency * FIRST_CHUNK_SHARE)
+        stats["errors"] += 1
+        return JSONResponse({"error": {"message": "simulated failure", "type": "server_error"}}, status_code=500)
+
+    content = _content(body)
+    usage = _usage(body, content)
+    stats["completions"] += 1
+    if not body.get("stream"):
+        await asyncio.sleep(latency)
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }],
+            "usage": usage
+        }
+
+    stats["streamed"] += 1
+    pieces = [content[i:i + CHUNK_SIZE] for i in range(0, len(content), CHUNK_SIZE)]
+    pause = latency * (1 - FIRST_CHUNK_SHARE) / len(pieces)
+
+    async def events():
+        await asyncio.sleep(latency * FIRST_CHUNK_SHARE)
+        yield _chunk(completion_id, model, {"role": "assistant", "content": ""})
+        for piece in pieces:
+            await asyncio.sleep(pause)
+            yield _chunk(completion_id, model, {"content": piece})
+        yield _chunk(completion_id, model, {}, finish_reason="stop")
+        if body.get("stream_options", {}).get("include_usage"):
+            yield _chunk(completion_id, model, {}, usage=usage)
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+@app.get("/stats")
+async def get_stats():
+    return stats
@@ -0,0 +1,255 @@
+"""End-to-end load test of GET / and POST /horoscope under uvicorn.
+
+    python benchmarks/loadtest.py --workers 2 --concurrency 64 --duration 30 --json results.json
+
+Starts the fake OpenAI server (benchmarks/fake_openai.py) and the app under
+uvicorn pointed at it, then drives form traffic across random birthdays and
+reading types from ``--concurrency`` simulated users. Reports requests per
+second, latency percentiles per route and resident memory per worker, and
+saves the lot as JSON so releases can be compared.
+
+Readings are cached per sign, type and day, so after the first few seconds
+most POSTs are cache hits, as in production; the upstream call count in the
+report shows how many actually reached the fake model. The driver itself
+needs httpx (``pip install httpx``), which the app does not.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+READING_TYPES = ["daily", "love", "career", "health", "comprehensive"]
+DAYS_IN_MONTH = [31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
+NAMES = ["Ada", "Grace", "Alan", "Linus", "Margaret", "Ken", "Barbara", "Dennis"]
+
+
+def _start(args: list, env: dict) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", *args, "--log-level", "warning"],
+        cwd=ROOT,
+        env={**os.environ, **env}
+    )
+
+
+async def _wait_ready(url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                await client.get(url)
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up within {timeout:.0f}s")
+
+
+def _form(rng: random.Random) -> dict:
+    month = rng.randint(1, 12)
+    return {
+        "name": rng.choice(NAMES),
+        "month": month,
+        "day": rng.randint(1, DAYS_IN_MONTH[month - 1]),
+        "year": rng.randint(1950, 2008),
+        "reading_type": rng.choice(READING_TYPES)
+    }
+
+
+async def _user(client: httpx.AsyncClient, rng: random.Random, post_share: float, until: float, samples: list) -> None:
+    """Simulate one visitor: load the home page or submit the form, over and over."""
+    while time.monotonic() < until:
+        route = "POST /horoscope" if rng.random() < post_share else "GET /"
+        started = time.perf_counter()
+        try:
+            if route == "GET /":
+                response = await client.get("/")
+            else:
+                response = await client.post("/horoscope", data=_form(rng), follow_redirects=True)
+            ok = response.status_code == 200
+        except httpx.HTTPError:
+            ok = False
+        samples.append((route, time.perf_counter() - started, ok))
+
+
+def _percentile(values: list, share: float) -> float:
+    """Nearest-rank percentile of already sorted values."""
+    index = max(0, min(len(values) - 1, round(share * len(values)) - 1))
+    return values[index]
+
+
+def _summarize(samples: list, elapsed: float) -> dict:
+    routes = {}
+    for route in sorted({s[0] for s in samples}):
+        latencies = sorted(s[1] for s in samples if s[0] == route)
+        routes[route] = {
+            "requests": len(latencies),
+            "errors": sum(1 for s in samples if s[0] == route and not s[2]),
+            "rps": round(len(latencies) / elapsed, 1),
+            **{
+                f"p{p}_ms": round(_percentile(latencies, p / 100) * 1000, 2)
+                for p in (50, 90, 99)
+            },
+            "max_ms": round(latencies[-1] * 1000, 2)
+        }
+    return {
+        "requests": len(samples),
+        "errors": sum(1 for s in samples if not s[2]),
+        "rps": round(len(samples) / elapsed, 1),
+        "routes": routes
+    }
+
+
+def _rss_mb(pid: int):
+    """Resident memory of a process in MB, read from /proc (Linux only)."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        return None
+    return None
+
+
+def _workers(pid: int) -> list:
+    """Pids of the worker processes uvicorn spawned, skipping multiprocessing helpers."""
+    workers = []
+    for entry in os.listdir("/proc") if os.path.isdir("/proc") else []:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # The parent pid is the second field after the parenthesised command
+                if int(f.read().rsplit(")", 1)[1].split()[1]) != pid:
+                    continue
+            with open(f"/proc/{entry}/cmdline", "rb") as f:
+                if b"resource_tracker" not in f.read():
+                    workers.append(int(entry))
+        except (OSError, IndexError, ValueError):
+            continue
+    return workers
+
+
+def _worker_memory(server: subprocess.Popen, workers: int) -> list:
+    """RSS of each uvicorn worker; with one worker the server process serves itself."""
+    pids = [server.pid] if workers == 1 else _workers(server.pid)
+    return [{"pid": pid, "rss_mb": _rss_mb(pid)} for pid in pids]
+
+
+async def run(args) -> dict:
+    fake_url = f"http://127.0.0.1:{args.fake_port}"
+    app_url = f"http://127.0.0.1:{args.port}"
+    fake = _start(
+        ["--app-dir", "benchmarks", "fake_openai:app", "--port", str(args.fake_port)],
+        {
+            "FAKE_OPENAI_LATENCY": str(args.latency),
+            "FAKE_OPENAI_SIGMA": str(args.sigma),
+            "FAKE_OPENAI_ERROR_RATE": str(args.error_rate)
+        }
+    )
+    server = None
+    try:
+        await _wait_ready(f"{fake_url}/stats")
+        server = _start(
+            ["app.main:app", "--port", str(args.port), "--workers", str(args.workers)],
+            {
+                "OPENAI_BASE_URL": f"{fake_url}/v1",
+                "OPENAI_API_KEY": "loadtest",
+                "GENERATION_BACKEND": "openai",
+                "READING_STORE_PATH": "",
+                # Every simulated user comes from one address; measure throughput, not the rate limit
+                "CLIENT_RATE": "0"
+            }
+        )
+        await _wait_ready(f"{app_url}/")
+
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=app_url, limits=limits, timeout=30) as client:
+            if args.warmup:
+                until = time.monotonic() + args.warmup
+                await asyncio.gather(*[
+                    _user(client, random.Random(f"warmup-{i}"), args.post_share, until, [])
+                    for i in range(args.concurrency)
+                ])
+            samples = []
+            started = time.monotonic()
+            await asyncio.gather(*[
+                _user(client, random.Random(f"{args.seed}-{i}"), args.post_share, started + args.duration, samples)
+                for i in range(args.concurrency)
+            ])
+            elapsed = time.monotonic() - started
+            upstream = (await client.get(f"{fake_url}/stats")).json()
+
+        summary = _summarize(samples, elapsed)
+        posts = summary["routes"].get("POST /horoscope", {}).get("requests", 0)
+        return {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "config": {
+                "workers": args.workers,
+                "concurrency": args.concurrency,
+                "duration_s": args.duration,
+                "post_share": args.post_share,
+                "upstream_latency_s": args.latency,
+                "upstream_sigma": args.sigma,
+                "upstream_error_rate": args.error_rate
+            },
+            **summary,
+            "upstream": upstream,
+            # Readings were requested but none was generated, so every figure measures fallbacks
+            "upstream_unreached": bool(posts) and not upstream["completions"],
+            "workers": _worker_memory(server, args.workers)
+        }
+    finally:
+        for process in (server, fake):
+            if process is not None:
+                process.terminate()
+                process.wait(timeout=10)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=32, help="simulated users")
+    parser.add_argument("--duration", type=float, default=20, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=3, help="unmeasured seconds first")
+    parser.add_argument("--post-share", type=float, default=0.5, help="share of requests submitting the form")
+    parser.add_argument("--latency", type=float, default=0.8, help="median fake upstream latency in seconds")
+    parser.add_argument("--sigma", type=float, default=0.3, help="log-normal spread of the upstream latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of upstream calls that fail")
+    parser.add_argument("--port", type=int, default=8010)
+    parser.add_argument("--fake-port", type=int, default=8011)
+    parser.add_argument("--seed", default="load")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args(argv)
+
+    result = asyncio.run(run(args))
+    print(f"{result['requests']} requests, {result['rps']} rps, {result['errors']} errors")
+    print(f"{'route':<18} {'reqs':>7} {'rps':>8} {'p50':>9} {'p90':>9} {'p99':>9} {'max':>9}")
+    for route, r in result["routes"].items():
+        print(
+            f"{route:<18} {r['requests']:>7} {r['rps']:>8} {r['p50_ms']:>7.1f}ms "
+            f"{r['p90_ms']:>7.1f}ms {r['p99_ms']:>7.1f}ms {r['max_ms']:>7.1f}ms"
+        )
+    print(f"upstream: {json.dumps(result['upstream'])}")
+    if result["upstream_unreached"]:
+        print("error: no call reached the fake upstream, so every reading was a fallback")
+    for worker in result["workers"]:
+        print(f"worker {worker['pid']}: {worker['rss_mb']} MB")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+    return 1 if result["errors"] or result["upstream_unreached"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,142 @@
+"""Microbenchmarks for rendering and zodiac lookup, with regression gates.
+
+    python benchmarks/micro.py                 # compare against the baselines
+    python benchmarks/micro.py --update        # record new baselines
+    python benchmarks/micro.py --threshold 15  # fail above 15% slower
+
+Each benchmark's best time per call is divided by that of a fixed
+pure-Python calibration loop timed just before it, so baselines recorded on one machine
+stay meaningful on another. A benchmark over the threshold is re-measured
+before it counts, and the script exits with status 1 if any benchmark stays
+more than ``--threshold`` percent slower than its baseline.
+"""
+
+import argparse
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.horoscope import READING_TYPES, _get_fallback_horoscope  # noqa: E402
+from app.templates import get_base_styles, render_home_page, render_reading_page  # noqa: E402
+from app.zodiac import DAYS_IN_MONTH, get_zodiac_sign  # noqa: E402
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+DEFAULT_THRESHOLD = 25.0
+REPEAT = 7
+# Re-measure apparent regressions this many times before failing, keeping the best
+CONFIRM_RUNS = 2
+
+SECTIONS = READING_TYPES["comprehensive"]["sections"]
+HOROSCOPE = _get_fallback_horoscope(SECTIONS)
+BIRTHDAYS = [(month, day) for month in range(1, 13) for day in range(1, DAYS_IN_MONTH[month - 1] + 1)]
+
+
+def _every_birthday() -> None:
+    for month, day in BIRTHDAYS:
+        get_zodiac_sign(month, day)
+
+
+def _calibration() -> None:
+    total = 0
+    for i in range(10000):
+        total += i * i % 7
+
+
+BENCHMARKS = {
+    "render_home_page": render_home_page,
+    "render_reading_page": lambda: render_reading_page("Ada", "leo", "comprehensive", HOROSCOPE),
+    "get_base_styles": get_base_styles,
+    "get_zodiac_sign x366": _every_birthday,
+    "_get_fallback_horoscope": lambda: _get_fallback_horoscope(SECTIONS),
+}
+
+
+def _best_seconds(fn) -> float:
+    """Best time per call over REPEAT runs, each lasting at least 0.2 s."""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=REPEAT, number=number)) / number
+
+
+def run(names: list) -> dict:
+    results = {}
+    for name in names:
+        # Calibrate right before each benchmark so drifting machine load cancels out
+        calibration = _best_seconds(_calibration)
+        seconds = _best_seconds(BENCHMARKS[name])
+        results[name] = {"us": round(seconds * 1e6, 3), "relative": float(f"{seconds / calibration:.4g}")}
+    return results
+
+
+def compare(results: dict, baselines: dict, threshold: float) -> list:
+    """Return the names of benchmarks slower than their baseline by more than ``threshold`` percent."""
+    regressions = []
+    for name, result in results.items():
+        baseline = baselines.get(name)
+        if baseline is None:
+            result["change_pct"] = None
+            continue
+        change = (result["relative"] / baseline["relative"] - 1) * 100
+        result["change_pct"] = round(change, 1)
+        if change > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--update", action="store_true", help="record the results as the new baselines")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="allowed slowdown in percent")
+    parser.add_argument("--only", action="append", choices=list(BENCHMARKS), help="run only this benchmark")
+    parser.add_argument("--baselines", default=BASELINE_PATH)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args(argv)
+
+    results = run(args.only or list(BENCHMARKS))
+    if args.update:
+        baselines = {}
+        if os.path.exists(args.baselines):
+            with open(args.baselines) as f:
+                baselines = json.load(f)
+        baselines.update({name: {"relative": r["relative"]} for name, r in results.items()})
+        with open(args.baselines, "w") as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+            f.write("\n")
+        regressions = []
+    else:
+        try:
+            with open(args.baselines) as f:
+                baselines = json.load(f)
+        except FileNotFoundError:
+            baselines = {}
+        regressions = compare(results, baselines, args.threshold)
+        for _ in range(CONFIRM_RUNS):
+            if not regressions:
+                break
+            for name, rerun in run(regressions).items():
+                if rerun["relative"] < results[name]["relative"]:
+                    results[name] = rerun
+            regressions = compare(results, baselines, args.threshold)
+
+    print(f"{'benchmark':<26} {'time':>12} {'vs baseline':>12}")
+    for name, r in results.items():
+        change = r.get("change_pct")
+        if args.update:
+            status = "recorded"
+        else:
+            status = "new" if change is None else f"{change:+.1f}%"
+        marker = "  REGRESSION" if name in regressions else ""
+        print(f"{name:<26} {r['us']:>10.2f}us {status:>12}{marker}")
+    if args.update:
+        print(f"baselines written to {args.baselines}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"threshold_pct": args.threshold, "results": results, "regressions": regressions}, f, indent=2)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,17 @@
+"""Reset the app's process-wide state between tests."""
+
+import pytest
+
+from app.cache import reading_cache, section_cache
+from app.resilience import breaker
+
+
+@pytest.fixture(autouse=True)
+def fresh_state():
+    reading_cache.clear()
+    section_cache.clear()
+    breaker.record_success()
+    yield
+    reading_cache.clear()
+    section_cache.clear()
+    breaker.record_success()
@@ -0,0 +1,92 @@
+"""Concurrency lanes, their pressure gauges and per-client rate limits."""
+
+import asyncio
+import time
+
+import pytest
+
+from app.admission import ClientRateLimiter, Lane, Overloaded, PressureGauge
+
+
+def test_lane_queues_then_refuses():
+    async def scenario():
+        lane = Lane("test", limit=1, max_queue=1, queue_timeout=1)
+        release = asyncio.Event()
+        order = []
+
+        async def generate(name):
+            async with lane.slot():
+                order.append(name)
+                await release.wait()
+
+        first = asyncio.ensure_future(generate("first"))
+        await asyncio.sleep(0)
+        queued = asyncio.ensure_future(generate("queued"))
+        await asyncio.sleep(0)
+        assert lane.active == 1 and lane.waiting == 1
+        with pytest.raises(Overloaded, match="queue is full"):
+            await generate("refused")
+        release.set()
+        await asyncio.gather(first, queued)
+        assert order == ["first", "queued"]
+        assert lane.active == 0 and lane.waiting == 0
+
+    asyncio.run(scenario())
+
+
+def test_lane_wait_times_out():
+    async def scenario():
+        lane = Lane("test", limit=1, max_queue=4, queue_timeout=0.02)
+        async with lane.slot():
+            with pytest.raises(Overloaded, match="no test slot"):
+                async with lane.slot():
+                    pass
+            assert lane.waiting == 0
+
+    asyncio.run(scenario())
+
+
+def test_latency_needs_enough_samples():
+    gauge = PressureGauge(mode="auto", max_queue=10, max_latency=1.0, hold=0, min_samples=3)
+    gauge.observe_latency(5.0)
+    gauge.observe_latency(5.0)
+    assert not gauge.degraded(0)
+    gauge.observe_latency(5.0)
+    assert gauge.degraded(0)
+
+
+def test_degraded_mode_holds_and_then_clears():
+    gauge = PressureGauge(mode="auto", max_queue=10, max_latency=1.0, hold=0.05, min_samples=1)
+    assert gauge.degraded(10)
+    assert gauge.degraded(0)
+    time.sleep(0.06)
+    assert gauge.degraded(6)
+    assert not gauge.degraded(4)
+    assert gauge.latency is None and gauge.samples == 0
+
+
+def test_forced_modes():
+    assert PressureGauge(mode="on").degraded(0)
+    assert not PressureGauge(mode="off", max_queue=1).degraded(100)
+
+
+def test_rate_limiter_spends_the_burst_then_asks_to_wait():
+    limiter = ClientRateLimiter(rate=1, burst=2)
+    assert limiter.take("a") == 0
+    assert limiter.take("a") == 0
+    assert limiter.take("a") == pytest.approx(1, abs=0.05)
+    assert limiter.take("b", cost=2) == 0
+
+
+def test_rate_limiter_forgets_the_oldest_clients():
+    limiter = ClientRateLimiter(rate=1, burst=1, max_clients=2)
+    limiter.take("a")
+    limiter.take("b")
+    limiter.take("c")
+    assert limiter.take("a") == 0
+    assert limiter.take("c") > 0
+
+
+def test_rate_limiter_disabled():
+    limiter = ClientRateLimiter(rate=0, burst=1)
+    assert all(limiter.take("a") == 0 for _ in range(5))
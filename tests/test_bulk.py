@@ -0,0 +1,45 @@
+"""Bulk generation: checkpoints and never writing fallback text."""
+
+import asyncio
+import json
+
+import pytest
+
+from app import bulk, horoscope
+from app.backends import LocalBackend
+
+
+@pytest.fixture
+def local_backend(monkeypatch):
+    monkeypatch.setattr(horoscope, "get_backend", lambda: LocalBackend(latency=0))
+
+
+def _input(tmp_path, rows: int = 3):
+    path = tmp_path / "in.csv"
+    path.write_text("name,month,day\n" + "".join(f"u{i},8,{i + 1}\n" for i in range(rows)))
+    return str(path)
+
+
+def test_writes_every_row(tmp_path, local_backend):
+    output = str(tmp_path / "out.jsonl")
+    stats = asyncio.run(bulk.run_bulk(_input(tmp_path), output))
+    assert stats["written"] == 3 and stats["failed"] == 0
+    records = [json.loads(line) for line in open(output)]
+    assert [r["sign"] for r in records] == ["leo"] * 3
+
+
+def test_resume_without_output_starts_over(tmp_path, local_backend):
+    output = tmp_path / "out.jsonl"
+    (tmp_path / "out.jsonl.checkpoint").write_text(json.dumps({"rows": 2, "offset": 1332}))
+    stats = asyncio.run(bulk.run_bulk(_input(tmp_path), str(output), resume=True))
+    assert stats["written"] == 3
+    assert b"\0" not in output.read_bytes()
+
+
+def test_failed_generation_marks_rows(tmp_path, monkeypatch):
+    monkeypatch.setattr(horoscope, "get_backend", lambda: LocalBackend(latency=0, error_rate=1))
+    monkeypatch.setattr(bulk, "RETRY_BACKOFF", 0)
+    output = str(tmp_path / "out.jsonl")
+    stats = asyncio.run(bulk.run_bulk(_input(tmp_path, 1), output, retries=1))
+    assert stats["failed"] == 1
+    assert "error" in json.loads(open(output).readline())
@@ -0,0 +1,32 @@
+"""The bounded, midnight-expiring reading cache."""
+
+import time
+from datetime import date, datetime, timedelta
+
+from app.cache import ReadingCache, next_local_midnight
+
+
+def test_entries_expire():
+    cache = ReadingCache()
+    cache.set("fresh", {"a": 1}, time.time() + 60)
+    cache.set("stale", {"b": 2}, time.time() - 1)
+    assert cache.get("fresh") == {"a": 1}
+    assert cache.get("stale") is None
+    assert len(cache) == 1
+
+
+def test_least_recently_used_is_evicted():
+    cache = ReadingCache(max_size=2)
+    later = time.time() + 60
+    cache.set("a", 1, later)
+    cache.set("b", 2, later)
+    cache.get("a")
+    cache.set("c", 3, later)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+
+
+def test_next_local_midnight():
+    day = date(2026, 10, 18)
+    assert next_local_midnight(day) == datetime(2026, 10, 19).timestamp()
+    assert next_local_midnight(day + timedelta(days=1)) > next_local_midnight(day)
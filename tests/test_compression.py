@@ -0,0 +1,78 @@
+"""Encoding negotiation and the compression middleware."""
+
+import asyncio
+import gzip
+import zlib
+
+from app.compression import CompressionMiddleware, choose_encoding
+
+
+def test_choose_encoding():
+    assert choose_encoding("gzip, br", ["br", "gzip"]) == "br"
+    assert choose_encoding("br;q=0, gzip", ["br", "gzip"]) == "gzip"
+    assert choose_encoding("*", ["gzip"]) == "gzip"
+    assert choose_encoding("*, gzip;q=0", ["gzip"]) is None
+    assert choose_encoding("identity", ["br", "gzip"]) is None
+    assert choose_encoding("gzip;q=bad", ["gzip"]) is None
+    assert choose_encoding("", ["gzip"]) is None
+
+
+def _app(chunks, headers=((b"content-type", b"text/html; charset=utf-8"),)):
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": list(headers)})
+        for i, chunk in enumerate(chunks):
+            await send({"type": "http.response.body", "body": chunk, "more_body": i < len(chunks) - 1})
+    return app
+
+
+def _call(app, accept_encoding="gzip"):
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    async def receive():
+        return {"type": "http.request"}
+
+    scope = {"type": "http", "headers": [(b"accept-encoding", accept_encoding.encode())]}
+    asyncio.run(CompressionMiddleware(app, min_size=16)(scope, receive, send))
+    return dict(messages[0]["headers"]), [m["body"] for m in messages[1:]]
+
+
+def test_streamed_body_is_decodable_chunk_by_chunk():
+    chunks = [b"<p>first</p>" * 10, b"<p>second</p>" * 10, b""]
+    headers, bodies = _call(_app(chunks))
+    assert headers[b"content-encoding"] == b"gzip"
+    assert b"content-length" not in headers
+    assert headers[b"vary"] == b"Accept-Encoding"
+    decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    # Each chunk is flushed, so what arrived so far decodes without the rest
+    assert decoder.decompress(bodies[0]) == chunks[0]
+    assert decoder.decompress(bodies[1]) == chunks[1]
+    decoder.decompress(bodies[2])
+    assert decoder.eof
+
+
+def test_whole_body_gets_a_length():
+    body = b"<p>reading</p>" * 20
+    headers, bodies = _call(_app([body]))
+    assert gzip.decompress(bodies[0]) == body
+    assert headers[b"content-length"] == str(len(bodies[0])).encode()
+
+
+def test_small_encoded_and_binary_bodies_pass_through():
+    headers, bodies = _call(_app([b"<p>hi</p>"]))
+    assert b"content-encoding" not in headers and bodies == [b"<p>hi</p>"]
+
+    precompressed = gzip.compress(b"x" * 100)
+    headers, bodies = _call(_app([precompressed], [(b"content-type", b"text/css"), (b"content-encoding", b"gzip")]))
+    assert bodies == [precompressed]
+
+    headers, bodies = _call(_app([b"\x89PNG" * 20], [(b"content-type", b"image/png")]))
+    assert b"content-encoding" not in headers and bodies == [b"\x89PNG" * 20]
+
+
+def test_identity_clients_get_the_plain_body():
+    body = b"<p>reading</p>" * 20
+    headers, bodies = _call(_app([body]), accept_encoding="")
+    assert b"content-encoding" not in headers and bodies == [body]
@@ -0,0 +1,26 @@
+"""Static export of the day's pages."""
+
+import asyncio
+from datetime import date
+
+from app import horoscope
+from app.backends import LocalBackend
+from app.export import export_site
+
+
+def test_export_writes_every_page(tmp_path, monkeypatch):
+    monkeypatch.setattr(horoscope, "get_backend", lambda: LocalBackend(latency=0))
+    (tmp_path / "horoscope" / "leo" / "love" / "2000-01-01").mkdir(parents=True)
+    summary = asyncio.run(export_site(str(tmp_path), date.today()))
+    assert summary["pages"] == 60 and not summary["skipped"]
+    assert summary["pruned"] == 1
+    page = tmp_path / "horoscope" / "leo" / "love" / date.today().isoformat() / "index.html"
+    assert "<!DOCTYPE html>" in page.read_text()
+    assert (tmp_path / "index.html").exists()
+    assert not list(tmp_path.rglob("*.gz"))
+
+
+def test_dry_run_writes_nothing(tmp_path):
+    summary = asyncio.run(export_site(str(tmp_path / "site"), date.today(), dry_run=True))
+    assert summary["pages"] == 60
+    assert not (tmp_path / "site").exists()
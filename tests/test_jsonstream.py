@@ -0,0 +1,50 @@
+"""Incremental parsing of streamed reading JSON."""
+
+import json
+
+from app.jsonstream import ReadingParser
+
+READING = {
+    "sections": {"general": 'A "bright" day \\ café ✨', "advice": "Line one\nline two"},
+    "lucky_number": 17,
+    "lucky_color": "Gold",
+    "energy_level": 88
+}
+
+
+def _feed_in_pieces(text: str, size: int):
+    parser = ReadingParser()
+    events = []
+    for i in range(0, len(text), size):
+        events += parser.feed(text[i:i + size])
+    return parser, events
+
+
+def test_any_chunking_yields_the_same_reading():
+    text = "```json\n" + json.dumps(READING, ensure_ascii=True) + "\n```"
+    for size in (1, 2, 7, len(text)):
+        parser, events = _feed_in_pieces(text, size)
+        assert parser.done
+        assert parser.result() == READING
+        assert events == [
+            ("section", "general", READING["sections"]["general"]),
+            ("section", "advice", READING["sections"]["advice"]),
+            ("field", "lucky_number", 17),
+            ("field", "lucky_color", "Gold"),
+            ("field", "energy_level", 88),
+        ]
+
+
+def test_partial_input_returns_only_finished_values():
+    text = json.dumps(READING)
+    cut = text.index("line two")
+    parser, events = _feed_in_pieces(text[:cut], 5)
+    assert not parser.done
+    assert parser.result() == {"sections": {"general": READING["sections"]["general"]}}
+    assert [name for _, name, _ in events] == ["general"]
+
+
+def test_number_split_across_chunks():
+    parser = ReadingParser()
+    assert parser.feed('{"lucky_number": 4') == []
+    assert parser.feed('2, "energy_level": 7}') == [("field", "lucky_number", 42), ("field", "energy_level", 7)]
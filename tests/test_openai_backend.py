@@ -0,0 +1,102 @@
+"""Real completions through OpenAIBackend against benchmarks/fake_openai.py."""
+
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from datetime import date
+
+import pytest
+
+from app import llm
+from app.backends import OpenAIBackend
+from app.horoscope import READING_TYPES, _build_prompt, _request_reading
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture(scope="module")
+def fake_openai():
+    """Run the fake server and point the shared client at it."""
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}"
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "--app-dir", "benchmarks", "fake_openai:app",
+         "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT,
+        env={**os.environ, "FAKE_OPENAI_LATENCY": "0.05", "FAKE_OPENAI_SIGMA": "0"}
+    )
+    saved = {key: os.environ.get(key) for key in ("OPENAI_BASE_URL", "OPENAI_API_KEY")}
+    os.environ.update(OPENAI_BASE_URL=f"{url}/v1", OPENAI_API_KEY="test")
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                urllib.request.urlopen(f"{url}/stats")
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.1)
+        yield url
+    finally:
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        server.terminate()
+        server.wait(timeout=10)
+
+
+def _completions(url: str) -> int:
+    with urllib.request.urlopen(f"{url}/stats") as response:
+        return json.load(response)["completions"]
+
+
+def _run(coro):
+    async def run():
+        try:
+            return await coro
+        finally:
+            await llm.shutdown()
+    return asyncio.run(run())
+
+
+def test_complete_reaches_upstream(fake_openai):
+    before = _completions(fake_openai)
+    prompt = _build_prompt("leo", "love", date.today())
+    content, usage = _run(OpenAIBackend().complete(prompt))
+    assert set(json.loads(content)["sections"]) == set(READING_TYPES["love"]["sections"])
+    assert usage.completion_tokens > 0
+    assert _completions(fake_openai) == before + 1
+
+
+def test_stream_reaches_upstream(fake_openai):
+    prompt = _build_prompt("leo", "daily", date.today())
+
+    async def collect():
+        stream = await OpenAIBackend().open_stream(prompt)
+        try:
+            return "".join([fragment async for fragment in stream])
+        finally:
+            await stream.close()
+
+    content = _run(collect())
+    assert set(json.loads(content)["sections"]) == set(READING_TYPES["daily"]["sections"])
+
+
+def test_request_reading_is_not_a_fallback(fake_openai):
+    horoscope, usage = _run(_request_reading("virgo", "comprehensive", date.today(), backend=OpenAIBackend()))
+    assert usage is not None
+    assert horoscope["sections"]["general"].startswith("The general outlook")
@@ -0,0 +1,99 @@
+"""Circuit breaker states and the protected upstream call and stream."""
+
+import asyncio
+import time
+
+import pytest
+
+from app import resilience
+from app.resilience import CircuitBreaker, CircuitOpenError, protected_call, protected_stream
+
+
+def test_breaker_opens_then_probes_once_when_half_open():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    assert breaker.state == "half_open"
+    assert not breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.allow()
+
+
+def test_abandoned_probe_lets_the_next_one_through():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_abandoned()
+    assert breaker.allow()
+
+
+class FakeStream:
+    def __init__(self, items, delay=0.0):
+        self.items = items
+        self.delay = delay
+        self.closed = False
+
+    async def __aiter__(self):
+        for item in self.items:
+            await asyncio.sleep(self.delay)
+            yield item
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def breaker(monkeypatch):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    monkeypatch.setattr(resilience, "breaker", breaker)
+    return breaker
+
+
+async def _drain(stream, deadline=1.0):
+    async def open_stream():
+        return stream
+    return [item async for item in protected_stream(open_stream, deadline)]
+
+
+def test_protected_stream_yields_and_closes(breaker):
+    stream = FakeStream(["a", "b"])
+    assert asyncio.run(_drain(stream)) == ["a", "b"]
+    assert stream.closed
+    assert breaker.state == "closed"
+
+
+def test_protected_stream_deadline_covers_the_whole_stream(breaker):
+    stream = FakeStream(["a", "b", "c"], delay=0.04)
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(_drain(stream, deadline=0.1))
+    assert stream.closed
+    assert breaker.state == "open"
+
+
+def test_protected_stream_refuses_while_open(breaker):
+    breaker.record_failure()
+    stream = FakeStream(["a"])
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(_drain(stream))
+    assert not stream.closed
+
+
+def test_protected_call_records_failures(breaker):
+    async def fail():
+        raise RuntimeError("upstream down")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(protected_call(fail, deadline=1))
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(protected_call(fail, deadline=1))
@@ -0,0 +1,129 @@
+"""Coalescing of identical in-flight generations, plain and streamed."""
+
+import asyncio
+from datetime import date
+
+import pytest
+
+from app import horoscope
+from app.backends import LocalBackend
+from app.singleflight import SingleFlight
+
+
+def test_do_shares_one_call():
+    calls = []
+
+    async def fn():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "result"
+
+    async def run():
+        flight = SingleFlight()
+        return await asyncio.gather(*[flight.do("k", fn) for _ in range(5)]), flight.in_flight()
+
+    results, in_flight = asyncio.run(run())
+    assert results == ["result"] * 5
+    assert calls == [1]
+    assert in_flight == 0
+
+
+def test_do_shares_errors_then_forgets_the_key():
+    async def fail():
+        raise RuntimeError("upstream")
+
+    async def run():
+        flight = SingleFlight()
+        results = await asyncio.gather(flight.do("k", fail), flight.do("k", fail), return_exceptions=True)
+        return results, await flight.do("k", lambda: asyncio.sleep(0, "again"))
+
+    results, again = asyncio.run(run())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert again == "again"
+
+
+def test_stream_replays_to_late_subscribers():
+    async def items():
+        for i in range(3):
+            yield i
+            await asyncio.sleep(0.01)
+
+    async def run():
+        flight = SingleFlight()
+        first = asyncio.ensure_future(_consume(flight.stream("k", items)))
+        await asyncio.sleep(0.015)
+        late = await _consume(flight.stream("k", items))
+        return await first, late
+
+    assert asyncio.run(run()) == ([0, 1, 2], [0, 1, 2])
+
+
+def test_stream_raises_the_shared_error_after_its_items():
+    async def items():
+        yield 1
+        raise RuntimeError("cut off")
+
+    async def run():
+        received = []
+        with pytest.raises(RuntimeError):
+            async for item in SingleFlight().stream("k", items):
+                received.append(item)
+        return received
+
+    assert asyncio.run(run()) == [1]
+
+
+def test_call_and_stream_join_each_other():
+    async def call():
+        await asyncio.sleep(0.01)
+        return [1, 2]
+
+    async def items():
+        for i in (3, 4):
+            await asyncio.sleep(0.01)
+            yield i
+
+    async def run():
+        flight = SingleFlight()
+        started = asyncio.ensure_future(flight.do("a", call))
+        await asyncio.sleep(0)
+        replayed = await _consume(flight.stream("a", items, replay=list))
+        streaming = asyncio.ensure_future(_consume(flight.stream("b", items)))
+        await asyncio.sleep(0)
+        collected = await flight.do("b", call, collect=list)
+        return await started, replayed, await streaming, collected
+
+    assert asyncio.run(run()) == ([1, 2], [1, 2], [3, 4], [3, 4])
+
+
+def test_page_stream_and_api_request_make_one_upstream_call(monkeypatch):
+    calls = {"complete": 0, "stream": 0}
+    backend = LocalBackend(latency=0.05, latency_sigma=0)
+    complete, open_stream = backend.complete, backend.open_stream
+
+    async def counted_complete(prompt):
+        calls["complete"] += 1
+        return await complete(prompt)
+
+    async def counted_stream(prompt):
+        calls["stream"] += 1
+        return await open_stream(prompt)
+
+    monkeypatch.setattr(backend, "complete", counted_complete)
+    monkeypatch.setattr(backend, "open_stream", counted_stream)
+    monkeypatch.setattr(horoscope, "get_backend", lambda: backend)
+
+    async def run():
+        page = asyncio.ensure_future(_consume(horoscope.stream_horoscope("leo", "love")))
+        await asyncio.sleep(0)
+        reading = await horoscope.generate_horoscope("leo", "love")
+        return await page, reading
+
+    events, reading = asyncio.run(run())
+    assert calls == {"complete": 0, "stream": 1}
+    assert horoscope._reading_from_events(events) == reading
+    assert horoscope.is_final_reading("leo", "love", date.today())
+
+
+async def _consume(iterator) -> list:
+    return [item async for item in iterator]
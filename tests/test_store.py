@@ -0,0 +1,36 @@
+"""The persistent reading store, and the app carrying on without it."""
+
+import asyncio
+from datetime import date
+
+from app import store
+from app.horoscope import _stored_reading, save_reading
+
+HOROSCOPE = {"sections": {"general": "g", "advice": "a"}, "lucky_number": 7, "lucky_color": "Gold", "energy_level": 80}
+
+
+def test_round_trip_and_expiry(tmp_path):
+    db = store.SQLiteReadingStore(str(tmp_path / "r.db"))
+    today = date.today()
+    db.put("leo", "daily", today, HOROSCOPE, expires_at=4102444800)
+    db.put("leo", "love", today, HOROSCOPE, expires_at=1)
+    assert db.get("leo", "daily", today) == HOROSCOPE
+    assert db.get("leo", "love", today) is None
+    assert db.cleanup() == 1
+
+
+def test_unopenable_store_is_disabled_once(monkeypatch):
+    monkeypatch.setattr(store, "STORE_PATH", "/nonexistent/dir/r.db")
+    monkeypatch.setattr(store, "_store", None)
+    monkeypatch.setattr(store, "_store_failed", False)
+    opened = []
+    real = store.SQLiteReadingStore
+    monkeypatch.setattr(store, "SQLiteReadingStore", lambda path: opened.append(path) or real(path))
+
+    async def run():
+        await save_reading("leo", "daily", date.today(), HOROSCOPE)
+        return await _stored_reading("virgo", "daily", date.today())
+
+    assert asyncio.run(run()) is None
+    assert store.get_store() is None
+    assert opened == ["/nonexistent/dir/r.db"]
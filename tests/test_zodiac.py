@@ -0,0 +1,51 @@
+"""Table-driven zodiac lookup, checked against the original date ranges."""
+
+import pytest
+
+from app import zodiac
+from app.zodiac import DAYS_IN_MONTH, SIGN_NAMES, get_zodiac_sign, get_zodiac_sign_indices
+
+BIRTHDAYS = [(month, day) for month in range(1, 13) for day in range(1, DAYS_IN_MONTH[month - 1] + 1)]
+
+
+def _reference(month: int, day: int) -> str:
+    """The lookup as it was before the table, one range per sign."""
+    ranges = [
+        ("aries", (3, 21), (4, 19)), ("taurus", (4, 20), (5, 20)), ("gemini", (5, 21), (6, 20)),
+        ("cancer", (6, 21), (7, 22)), ("leo", (7, 23), (8, 22)), ("virgo", (8, 23), (9, 22)),
+        ("libra", (9, 23), (10, 22)), ("scorpio", (10, 23), (11, 21)), ("sagittarius", (11, 22), (12, 21)),
+        ("capricorn", (12, 22), (1, 19)), ("aquarius", (1, 20), (2, 18)),
+    ]
+    for sign, (start_month, start_day), (end_month, end_day) in ranges:
+        if (month == start_month and day >= start_day) or (month == end_month and day <= end_day):
+            return sign
+    return "pisces"
+
+
+def test_every_birthday_matches_the_original_ranges():
+    assert all(get_zodiac_sign(month, day) == _reference(month, day) for month, day in BIRTHDAYS)
+
+
+@pytest.mark.parametrize("month, day", [(2, 30), (4, 31), (13, 1), (0, 5), (1, 0)])
+def test_invalid_birthdays_are_rejected(month, day):
+    with pytest.raises(ValueError):
+        get_zodiac_sign(month, day)
+
+
+def test_indices_match_single_lookups():
+    months, days = zip(*BIRTHDAYS)
+    indices = get_zodiac_sign_indices(months, days)
+    assert [SIGN_NAMES[i] for i in indices] == [get_zodiac_sign(m, d) for m, d in BIRTHDAYS]
+
+
+def test_indices_without_numpy(monkeypatch):
+    monkeypatch.setattr(zodiac, "np", None)
+    assert [SIGN_NAMES[i] for i in get_zodiac_sign_indices([8, 3], [1, 25])] == ["leo", "aries"]
+
+
+@pytest.mark.parametrize("numpy", [True, False])
+def test_indices_name_the_first_invalid_position(monkeypatch, numpy):
+    if not numpy:
+        monkeypatch.setattr(zodiac, "np", None)
+    with pytest.raises(ValueError, match="position 1"):
+        get_zodiac_sign_indices([1, 2, 13], [1, 30, 1])